@@ -0,0 +1,417 @@
+""" Benchmarks of the date conversion.
+
+    python benchmark.py stages --size 2000 --output results.json
+    python benchmark.py compare old_results.json new_results.json
+    python benchmark.py scaling --rows 20000 --workers 1 2 4 8 --chunk-size 1000
+    python benchmark.py phrases
+    python benchmark.py importtime --fallback dateparser strptime none
+
+    stages command times every stage of the conversion separately and the whole conversion (convert_batch of one text),
+    on a reproducible corpus built from test_texts, verb.txt, generated dates and typos of the number words.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import convert_extract
+from convert_extract import MONTHS
+from numerals import PhraseTable, date_phrases, number_to_words, parse_values, value_phrases
+from stem_app import get_stemmer
+from stemmer import BASE_DIR
+
+# Stages of the conversion in the order they run
+STAGES = ['stem_words', 'split_input', 'to_convert', 'extract_entities', 'extract_date_dateparser', 'end_to_end']
+
+# Letters used for the synthetic typos
+TYPO_LETTERS = 'abcçdeəfgğhxıijkqlmnoöprsştuüvyz'
+
+
+def generate_dates(rows:int, seed:int = 0) -> list:
+    """ Random dates in between 1900 and 2100 written with words in several orders, such that
+        "on iki dekabr min doqquz yüz doxsan beş" or "min doqquz yüz doxsan beş dekabr on iki"
+
+        param: rows -> number of the generated texts
+        param: seed -> seed of the random generator, same seed gives the same texts
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(rows):
+        year = number_to_words(rng.randint(1900, 2100))
+        month = rng.choice(MONTHS)
+        day = number_to_words(rng.randint(1, 28))
+        texts.append(rng.choice([f'{day} {month} {year}', f'{year} {month} {day}', f'{year} {day} {month}']))
+    return texts
+
+
+def make_typo(word:str, rng:random.Random) -> str:
+    """ Word with one random letter replaced, deleted, inserted or swapped with the next one """
+    if len(word) < 2:
+        return word + rng.choice(TYPO_LETTERS)
+    chars = list(word)
+    position = rng.randrange(len(chars) - 1)
+    operation = rng.randrange(4)
+    if operation == 0:
+        chars[position] = rng.choice(TYPO_LETTERS)
+    elif operation == 1:
+        del chars[position]
+    elif operation == 2:
+        chars.insert(position, rng.choice(TYPO_LETTERS))
+    else:
+        chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return ''.join(chars)
+
+
+def load_verb_forms() -> list:
+    """ Inflected verb forms from verb.txt """
+    with open(os.path.join(BASE_DIR, 'verb.txt'), 'r', encoding='utf-8-sig') as verb_file:
+        return [word for line in verb_file for word in line.split()]
+
+
+def generate_numeric_dates(rows:int, seed:int = 0) -> list:
+    """ Random dates written with digits in the formats of extract_date_dateparser, such that "1992.06.25", "25/06/1992", "19920625" """
+    rng = random.Random(seed)
+    formats = ['%Y.%m.%d', '%d.%m.%Y', '%d/%m/%Y', '%Y-%m-%d', '%Y/%m/%d', '%Y%m%d', '%d.%m.%y']
+    texts = []
+    for _ in range(rows):
+        date = time.struct_time((rng.randint(1900, 2100), rng.randint(1, 12), rng.randint(1, 28), 0, 0, 0, 0, 1, -1))
+        texts.append(time.strftime(rng.choice(formats), date))
+    return texts
+
+
+def build_corpus(size:int, seed:int = 0) -> dict:
+    """ Reproducible inputs of every stage of the conversion.
+        Phrases are test_texts of convert_extract, generated dates and generated dates with typos in the number words,
+        words are verb.txt forms, numbers dictionary keys with their typos and words of the phrases.
+        Inputs of the later stages are outputs of the previous stages for the phrases.
+
+        param: size -> number of the generated phrases
+        param: seed -> seed of the random generator, same seed gives the same corpus
+
+        return: dictionary of the stage name and list of the inputs of the stage
+    """
+    rng = random.Random(seed)
+
+    phrases = list(convert_extract.test_texts) + generate_dates(size, seed)
+    # the same dates with one typo in one of the number words
+    for phrase in generate_dates(size // 2, seed + 1):
+        words = phrase.split(' ')
+        numbers_positions = [i for i, word in enumerate(words) if word not in MONTHS]
+        position = rng.choice(numbers_positions)
+        words[position] = make_typo(words[position], rng)
+        phrases.append(' '.join(words))
+
+    number_words = list(convert_extract.numbers)
+    words = load_verb_forms() + number_words + [make_typo(word, rng) for word in number_words for _ in range(3)]
+    words += [word for phrase in phrases[:size] for word in phrase.split(' ')]
+
+    splitted = [convert_extract.split_tokens(phrase, convert_extract.suffix_shorten_dict) for phrase in phrases]
+    converted = [convert_extract.to_convert(tokens) for tokens in splitted]
+
+    return {
+        'stem_words': words,
+        'split_input': phrases,
+        'to_convert': splitted,
+        'extract_entities': converted,
+        'extract_date_dateparser': generate_numeric_dates(max(size // 10, 1), seed),
+        'end_to_end': phrases + generate_numeric_dates(max(size // 10, 1), seed + 1),
+    }
+
+
+def stage_functions() -> dict:
+    """ Function of every stage that takes one input of the corpus """
+    stemmer = get_stemmer()
+    return {
+        'stem_words': lambda word: stemmer.stem_words([word]),
+        'split_input': lambda phrase: convert_extract.split_input(phrase, convert_extract.suffix_shorten_dict),
+        'to_convert': convert_extract.to_convert,
+        'extract_entities': convert_extract.extract_entities,
+        'extract_date_dateparser': convert_extract.extract_date_dateparser,
+        'end_to_end': lambda text: convert_extract.convert_batch([text]),
+    }
+
+
+def percentile(sorted_values:list, fraction:float) -> float:
+    """ Value below which the given fraction of the sorted values are, nearest-rank method """
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_stage(function, inputs:list, rounds:int = 3) -> dict:
+    """ Times every call of the function on every input.
+        First round runs on cold caches, the next rounds show the steady state of the cached conversion.
+
+        return: dictionary of ops/sec, p50/p99 latency in microseconds and peak traced memory in KiB
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in inputs:
+            call_start = time.perf_counter_ns()
+            function(item)
+            latencies.append(time.perf_counter_ns() - call_start)
+    seconds = time.perf_counter() - start
+
+    # memory is measured in a separate round, tracing slows the calls down
+    tracemalloc.start()
+    for item in inputs:
+        function(item)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'ops_per_second': len(latencies) / seconds,
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+        'mean_us': statistics.fmean(latencies) / 1000,
+        'peak_memory_kib': peak_memory / 1024,
+    }
+
+
+def clear_caches():
+    """ Empties the caches of the conversion, so that every stage starts cold """
+    from stemmer import longest_stem
+    longest_stem.cache_clear()
+    convert_extract.number_matcher.cache_clear()
+    convert_extract.month_matcher.cache_clear()
+    convert_extract.token_cache.cache_clear()
+    convert_extract.suffix_normalizer.cache_clear()
+
+
+def bench_stages(size:int, seed:int = 0, rounds:int = 3, stages:list = None) -> dict:
+    """ Benchmarks every stage on the corpus of build_corpus(size, seed)
+
+        return: dictionary with "meta" information of the run and "stages" results of bench_stage
+    """
+    corpus = build_corpus(size, seed)
+    functions = stage_functions()
+    results = {}
+    for stage in stages or STAGES:
+        clear_caches()
+        results[stage] = bench_stage(functions[stage], corpus[stage], rounds)
+        results[stage]['inputs'] = len(corpus[stage])
+
+    meta = {'size': size, 'seed': seed, 'rounds': rounds, 'python': platform.python_version(),
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    return {'meta': meta, 'stages': results}
+
+
+def compare_results(old:dict, new:dict) -> list:
+    """ Ratios of the new results to the old ones for every stage found in both
+
+        return: list of (stage, old ops/sec, new ops/sec, ops/sec ratio, old p99, new p99) tuples
+    """
+    rows = []
+    for stage, new_result in new['stages'].items():
+        old_result = old['stages'].get(stage)
+        if old_result is None:
+            continue
+        rows.append((stage, old_result['ops_per_second'], new_result['ops_per_second'],
+                     new_result['ops_per_second'] / old_result['ops_per_second'], old_result['p99_us'], new_result['p99_us']))
+    return rows
+
+
+def bench_scaling(rows:int, workers_list:list, chunk_size:int, seed:int = 0) -> list:
+    """ Measures throughput of parallel.convert_parallel for every number of the workers
+
+        return: list of {"workers", "rows", "seconds", "rows_per_second", "speedup"} dictionaries
+    """
+    from parallel import convert_parallel
+
+    texts = generate_dates(rows, seed)
+    results = []
+    for workers in workers_list:
+        start = time.perf_counter()
+        converted = sum(1 for _ in convert_parallel(texts, workers, chunk_size))
+        seconds = time.perf_counter() - start
+        results.append({'workers': workers, 'rows': converted, 'seconds': seconds, 'rows_per_second': converted / seconds})
+
+    for result in results:
+        result['speedup'] = result['rows_per_second'] / results[0]['rows_per_second']
+    return results
+
+
+def check_phrase_table(table:PhraseTable, years=range(1900, 2101), days=range(1, 32)) -> list:
+    """ Checks that every phrase of the numbers below 100 and the years is converted by the table to the number
+        it was built from, and the year followed by a day to the year and the day. Day that fills the free places
+        of the year is read with it as one number, such that "min doqquz yüz bir" -> 1901, it is also accepted
+
+        return: list of (values, expected, found) of the wrong entries
+    """
+    wrong = []
+
+    def check(values, *expected):
+        found = table.get(values)
+        if found not in expected:
+            wrong.append((values, expected, found))
+
+    for number in [*range(100), *years]:
+        for values in value_phrases(number):
+            check(values, (number, len(values)))
+    for year in years:
+        for day in days:
+            for year_values in value_phrases(year):
+                for day_values in value_phrases(day):
+                    check(year_values + day_values, (year, len(year_values), day, len(day_values)),
+                          (year + day, len(year_values) + len(day_values)))
+    return wrong
+
+
+def bench_phrase_table(rounds:int = 3) -> dict:
+    """ Build time and memory of the phrase table of convert_extract.to_convert, and the lookup speed against parse_values
+
+        return: dictionary of memory_report() with "build_seconds", "lookup_ns", "parse_ns" and "wrong" entries
+    """
+    start = time.perf_counter()
+    table = PhraseTable(date_phrases())
+    build_seconds = time.perf_counter() - start
+
+    runs = [values for values, _ in table.items()]
+    lookup = parse = math.inf
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for values in runs:
+            table.get(values)
+        lookup = min(lookup, time.perf_counter() - start)
+        start = time.perf_counter()
+        for values in runs:
+            parse_values(values)
+        parse = min(parse, time.perf_counter() - start)
+
+    report = table.memory_report()
+    report.update({'build_seconds': build_seconds, 'lookup_ns': lookup / len(runs) * 1e9,
+                   'parse_ns': parse / len(runs) * 1e9, 'wrong': len(check_phrase_table(table))})
+    return report
+
+
+def parse_importtime(stderr:str) -> dict:
+    """ Microseconds of every module in the "python -X importtime" output: {module: (self, cumulative)} """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        modules[module.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def bench_import(module:str = 'convert_extract', fallback:str = None, repeats:int = 5, top:int = 5) -> dict:
+    """ Cold import of the module in new interpreters with "python -X importtime", and the first fallback parse after it,
+        that imports dateparser when the fallback backend is dateparser
+
+        param: fallback -> name of the fallback backend (date_fallback.FALLBACKS), DATE_TRANSLATION_FALLBACK of this process by default
+
+        return: {"module", "fallback", "import_ms", "first_fallback_ms", "dateparser_on_import", "top_modules"},
+                import_ms is the smallest cumulative import time of the repeats, top_modules are the slowest modules by their self time
+                of the whole run, modules imported by the first fallback parse as well
+    """
+    from date_fallback import FALLBACK_ENV
+
+    environment = dict(os.environ)
+    if fallback is not None:
+        environment[FALLBACK_ENV] = fallback
+    # prints whether dateparser was imported with the module and the time of the first fallback parse
+    code = (f'import sys, time, {module}, convert_extract\n'
+            'imported = "dateparser" in sys.modules\n'
+            'start = time.perf_counter()\n'
+            'convert_extract.extract_date_dateparser("1992.06/15")\n'
+            'print(imported, time.perf_counter() - start)')
+
+    runs = []
+    for _ in range(repeats):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                                 cwd=BASE_DIR, env=environment, check=True)
+        imported, first_fallback = process.stdout.split()
+        runs.append((parse_importtime(process.stderr), imported == 'True', float(first_fallback)))
+
+    modules, imported, _ = min(runs, key=lambda run: run[0][module][1])
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {'module': module, 'fallback': fallback or environment.get(FALLBACK_ENV) or 'default',
+            'import_ms': modules[module][1] / 1000, 'first_fallback_ms': min(run[2] for run in runs) * 1000,
+            'dateparser_on_import': imported, 'top_modules': [(name, self_us / 1000) for name, (self_us, _) in slowest]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the date conversion.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scaling = commands.add_parser('scaling', help='throughput of the parallel conversion for different numbers of workers')
+    scaling.add_argument('--rows', type=int, default=20000, help='number of the generated dates (default: 20000)')
+    scaling.add_argument('--workers', type=int, nargs='+', default=None, help='numbers of the workers to compare (default: 1 2 4 ... CPUs)')
+    scaling.add_argument('--chunk-size', type=int, default=1000, help='number of the dates sent to a worker at once (default: 1000)')
+    scaling.add_argument('--seed', type=int, default=0)
+
+    stages = commands.add_parser('stages', help='speed and memory of every stage of the conversion')
+    stages.add_argument('--size', type=int, default=2000, help='number of the generated phrases in the corpus (default: 2000)')
+    stages.add_argument('--seed', type=int, default=0)
+    stages.add_argument('--rounds', type=int, default=3, help='number of the passes over the corpus (default: 3)')
+    stages.add_argument('--stage', action='append', choices=STAGES, help='benchmark only this stage, can be repeated')
+    stages.add_argument('--output', help='save the results to this JSON file')
+
+    compare = commands.add_parser('compare', help='compare two JSON files saved by the stages command')
+    compare.add_argument('old')
+    compare.add_argument('new')
+
+    phrases = commands.add_parser('phrases', help='build time, memory and correctness of the number phrase table')
+    phrases.add_argument('--rounds', type=int, default=3, help='number of the passes over the table (default: 3)')
+
+    importtime = commands.add_parser('importtime', help='cold import time of the conversion with "python -X importtime"')
+    importtime.add_argument('--module', default='convert_extract', help='module to import (default: convert_extract)')
+    importtime.add_argument('--fallback', nargs='+', default=[None], help='fallback backends to compare, see date_fallback (default: the current one)')
+    importtime.add_argument('--repeats', type=int, default=5, help='number of the imports, the fastest one is reported (default: 5)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'stages':
+        results = bench_stages(args.size, args.seed, args.rounds, args.stage)
+        print(f'{"stage":<24} {"inputs":>7} {"ops/s":>10} {"p50 us":>9} {"p99 us":>9} {"peak KiB":>9}')
+        for stage, result in results['stages'].items():
+            print(f'{stage:<24} {result["inputs"]:>7} {result["ops_per_second"]:>10.0f} {result["p50_us"]:>9.1f} {result["p99_us"]:>9.1f} {result["peak_memory_kib"]:>9.1f}')
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output_file:
+                json.dump(results, output_file, indent=2, sort_keys=True)
+
+    elif args.command == 'compare':
+        with open(args.old, 'r', encoding='utf-8') as old_file, open(args.new, 'r', encoding='utf-8') as new_file:
+            rows = compare_results(json.load(old_file), json.load(new_file))
+        print(f'{"stage":<24} {"old ops/s":>10} {"new ops/s":>10} {"ratio":>7} {"old p99":>9} {"new p99":>9}')
+        for stage, old_ops, new_ops, ratio, old_p99, new_p99 in rows:
+            print(f'{stage:<24} {old_ops:>10.0f} {new_ops:>10.0f} {ratio:>7.2f} {old_p99:>9.1f} {new_p99:>9.1f}')
+
+    elif args.command == 'scaling':
+        workers_list = args.workers
+        if workers_list is None:
+            cpus = os.cpu_count() or 1
+            workers_list = [1]
+            while workers_list[-1] * 2 <= cpus:
+                workers_list.append(workers_list[-1] * 2)
+        print(f'{"workers":>8} {"rows":>8} {"seconds":>9} {"rows/s":>10} {"speedup":>8}')
+        for result in bench_scaling(args.rows, workers_list, args.chunk_size, args.seed):
+            print(f'{result["workers"]:>8} {result["rows"]:>8} {result["seconds"]:>9.2f} {result["rows_per_second"]:>10.0f} {result["speedup"]:>8.2f}')
+
+    elif args.command == 'phrases':
+        report = bench_phrase_table(args.rounds)
+        for name, value in report.items():
+            print(f'{name:<16} {value:>12.6g}' if isinstance(value, float) else f'{name:<16} {value:>12}')
+        if report['wrong']:
+            raise SystemExit(f'{report["wrong"]} phrases are converted wrong')
+
+    elif args.command == 'importtime':
+        print(f'{"fallback":<12} {"import ms":>10} {"1st fallback ms":>16} {"dateparser on import":>21}  slowest modules (self ms)')
+        for fallback in args.fallback:
+            result = bench_import(args.module, fallback, args.repeats)
+            slowest = ', '.join(f'{name} {ms:.1f}' for name, ms in result['top_modules'][:3])
+            print(f'{result["fallback"]:<12} {result["import_ms"]:>10.1f} {result["first_fallback_ms"]:>16.1f} {str(result["dateparser_on_import"]):>21}  {slowest}')
+
+
+if __name__ == '__main__':
+    main()
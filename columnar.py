@@ -0,0 +1,151 @@
+""" Columnar date conversion for pandas, Arrow and NumPy string columns.
+
+    Every distinct token of the column is analyzed (stemmed and classified) once and every distinct token sequence
+    is converted once, results are broadcast back to the rows by array indexing. So the work grows with the number
+    of the distinct tokens and phrases, not with the number of the rows.
+
+        frame = convert_column(pandas_series)            # pandas DataFrame with the index of the series
+        columns = convert_column(["1992.06.25", ...])    # dictionary of the result columns
+
+    NumPy is optional, without it the columns are lists.
+"""
+import convert_extract
+from convert_extract import convert_splitted, get_root_and_suffix, resolve_pending_dateparser, suffix_shorten_dict
+from records import RESULT_FIELDS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Kinds of the tokens
+NUMBER = 'number'
+MONTH = 'month'
+PUNCTUATION = 'punctuation'
+STOP = 'stop'
+STEM = 'stem'
+
+# Result columns in their order
+COLUMNS = list(RESULT_FIELDS)
+
+
+def classify_token(token:str) -> str:
+    """ Kind of the lower cased token, in the order split_input checks them:
+        number word, punctuation kept without stemming, eliminated token, month, or word that needs stemming
+    """
+    if token in convert_extract.numbers:
+        return NUMBER
+    if token in convert_extract.add_without_stem:
+        return PUNCTUATION
+    if token in convert_extract.eliminate_list:
+        return STOP
+    if convert_extract.month_matcher.match(token) is not None:
+        return MONTH
+    return STEM
+
+
+class TokenVocabulary:
+    """ Token strings mapped to integer IDs, with the kind and the split_input output of every token.
+        It can be shared by several columns, every token is analyzed only once.
+    """
+
+    def __init__(self):
+        # token -> ID
+        self.ids = {}
+        # ID -> token, kind and split_input output of the token
+        self.tokens = []
+        self.kinds = []
+        self.analyses = []
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def add(self, token:str) -> int:
+        """ ID of the token, the token is analyzed when it is seen for the first time """
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+            kind = classify_token(token)
+            self.kinds.append(kind)
+            # the same elements as split_input gives for the token
+            if kind in (NUMBER, PUNCTUATION):
+                self.analyses.append((token,))
+            elif kind == STOP:
+                self.analyses.append(())
+            else:
+                self.analyses.append(tuple(get_root_and_suffix(token, suffix_shorten_dict)))
+        return token_id
+
+    def encode(self, text:str) -> tuple:
+        """ Token IDs of the text, tokenized as split_input does """
+        return tuple(self.add(token) for token in convert_extract.TOKEN_PATTERN.findall(text.lower()))
+
+    def splitted(self, token_ids:tuple) -> list:
+        """ split_input output of the text from its token IDs """
+        elems = []
+        for token_id in token_ids:
+            elems += self.analyses[token_id]
+        return elems
+
+
+def to_text_list(column) -> list:
+    """ Python list of the strings of pandas Series, Arrow array, NumPy array or any iterable. Missing values become empty strings """
+    if hasattr(column, 'to_pylist'):
+        values = column.to_pylist()
+    elif hasattr(column, 'tolist'):
+        values = column.tolist()
+    else:
+        values = list(column)
+    return [value if isinstance(value, str) else '' for value in values]
+
+
+def _factorize(values:list) -> tuple:
+    """ Index of the distinct value for every value and the list of the distinct values """
+    positions = {}
+    index = [positions.setdefault(value, len(positions)) for value in values]
+    return index, list(positions)
+
+
+def _take(values:list, index):
+    """ values[index] for every index, as NumPy array if NumPy is installed """
+    if numpy is not None:
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = values
+        return array[numpy.asarray(index, dtype=numpy.intp)]
+    return [values[position] for position in index]
+
+
+def convert_column(column, day_first:bool = None, vocabulary:TokenVocabulary = None):
+    """ Converts every text of the column, the results are the same as convert_batch gives.
+
+        param: column -> pandas Series, Arrow array, NumPy array or any iterable of the texts
+        param: day_first -> order of the day and the month in numerical dates, see parse_numeric_date
+        param: vocabulary -> TokenVocabulary shared with the other columns, new one is used if it is None
+
+        return: pandas DataFrame with the index of the Series if column is Series,
+                otherwise dictionary of the COLUMNS (NumPy object arrays or lists)
+    """
+    if vocabulary is None:
+        vocabulary = TokenVocabulary()
+    texts = to_text_list(column)
+
+    # distinct texts, then distinct token sequences of them: texts that differ only in case or spaces are converted once
+    text_index, distinct_texts = _factorize(texts)
+    sequence_index, distinct_sequences = _factorize([vocabulary.encode(text) for text in distinct_texts])
+
+    pending_dateparser = {}
+    sequence_results = [convert_splitted('', vocabulary.splitted(token_ids), day_first, pending_dateparser)
+                        for token_ids in distinct_sequences]
+    resolve_pending_dateparser(pending_dateparser)
+
+    # row -> distinct sequence
+    row_index = [sequence_index[position] for position in text_index]
+    columns = {'input': _take(texts, range(len(texts)))}
+    for name in COLUMNS[1:]:
+        columns[name] = _take([getattr(result, name) for result in sequence_results], row_index)
+
+    if hasattr(column, 'index') and hasattr(column, 'to_frame'):
+        import pandas
+        return pandas.DataFrame(columns, index=column.index)
+    return columns
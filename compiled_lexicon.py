@@ -0,0 +1,236 @@
+""" Compiled lexicon: words, suffixes and the suffix trie in one binary file
+    that is memory-mapped read-only, so all processes that use it share one copy of its pages.
+
+    Build the file once:
+        python compiled_lexicon.py build -o lexicon.bin [--words words.txt] [--suffixes suffix.txt]
+    and use it for the shared stemmer of stem_app:
+        DATE_TRANSLATION_LEXICON=lexicon.bin python convert_cli.py dates.txt
+
+    File layout (little-endian):
+        magic (8 bytes), number of the sections (uint32), section table of (name 16 bytes, offset uint64, length uint64),
+        then the sections, every one aligned to 8 bytes:
+            meta        JSON: format, lexicon version
+            words       string table sorted by UTF-8 bytes: count uint32, count+1 offsets uint32, UTF-8 blob
+            suffixes    string table in the order of suffix.txt
+            trie_nodes  uint32 triples (suffix index + 1 or 0, first edge, number of edges)
+            trie_edges  uint32 pairs (character code, child node), sorted by character inside every node
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from functools import lru_cache
+
+from stemmer import Lexicon, SUFFIX_PATH, WORDS_PATH
+from suffix_trie import SuffixTrie, _SUFFIX_INDEX
+
+MAGIC = b'AZLEX001'
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct('<8sI')
+_SECTION = struct.Struct('<16sQQ')
+_ALIGNMENT = 8
+
+
+def _string_table(strings:list) -> bytes:
+    """ count, offsets and blob of the strings """
+    encoded = [string.encode('utf8') for string in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack(f'<I{len(offsets)}I', len(encoded), *offsets) + b''.join(encoded)
+
+
+def _trie_arrays(trie:SuffixTrie) -> tuple:
+    """ Flattens the dictionary trie to node and edge arrays, nodes are numbered in breadth-first order """
+    nodes = []
+    edges = []
+    queue = [trie.root]
+    for node in queue:
+        children = sorted((char, child) for char, child in node.items() if char is not _SUFFIX_INDEX)
+        suffix_index = node.get(_SUFFIX_INDEX)
+        nodes += [0 if suffix_index is None else suffix_index + 1, len(edges) // 2, len(children)]
+        for char, child in children:
+            edges += [ord(char), len(queue)]
+            queue.append(child)
+    return struct.pack(f'<{len(nodes)}I', *nodes), struct.pack(f'<{len(edges)}I', *edges)
+
+
+def compile_lexicon(output_path:str, lexicon:Lexicon):
+    """ Writes the lexicon to the compiled file
+
+        param: output_path -> path of the compiled file
+        param: lexicon -> stemmer.Lexicon to compile
+    """
+    trie_nodes, trie_edges = _trie_arrays(lexicon.suffix_trie)
+    meta = {'format': FORMAT_VERSION, 'version': lexicon.version, 'words': len(lexicon.words), 'suffixes': len(lexicon.suffixes)}
+    sections = [
+        ('meta', json.dumps(meta).encode('utf8')),
+        ('words', _string_table(sorted(lexicon.words, key=lambda word: word.encode('utf8')))),
+        ('suffixes', _string_table(lexicon.suffixes)),
+        ('trie_nodes', trie_nodes),
+        ('trie_edges', trie_edges),
+    ]
+
+    def aligned(offset):
+        return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+    offset = aligned(_HEADER.size + _SECTION.size * len(sections))
+    table = []
+    for name, data in sections:
+        table.append(_SECTION.pack(name.encode('ascii'), offset, len(data)))
+        offset = aligned(offset + len(data))
+
+    with open(output_path, 'wb') as output_file:
+        output_file.write(_HEADER.pack(MAGIC, len(sections)))
+        output_file.write(b''.join(table))
+        for (name, data), entry in zip(sections, table):
+            section_offset = _SECTION.unpack(entry)[1]
+            output_file.write(b'\0' * (section_offset - output_file.tell()))
+            output_file.write(data)
+
+
+class MappedStringTable:
+    """ Read-only sequence of strings stored in the string table section, membership test is a binary search
+        and works only for the sorted tables
+    """
+
+    def __init__(self, section:memoryview):
+        self._count = struct.unpack_from('<I', section)[0]
+        self._offsets = section[4:4 * (self._count + 2)].cast('I')
+        self._blob = section[4 * (self._count + 2):]
+
+    def _bytes(self, index:int) -> bytes:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+    def __getitem__(self, index:int) -> str:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._bytes(index).decode('utf8')
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._bytes(index).decode('utf8')
+
+    def __contains__(self, word) -> bool:
+        if not isinstance(word, str):
+            return False
+        key = word.encode('utf8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._count and self._bytes(low) == key
+
+
+class MappedSuffixTrie:
+    """ suffix_trie.SuffixTrie stored in the trie_nodes and trie_edges sections, with the same matches method """
+
+    def __init__(self, suffixes:tuple, nodes:memoryview, edges:memoryview):
+        self.suffixes = suffixes
+        self._nodes = nodes.cast('I')
+        self._edges = edges.cast('I')
+
+    def _child(self, node:int, char:str):
+        """ Child of the node for the character or None, binary search over the sorted edges of the node """
+        code = ord(char)
+        low = self._nodes[3 * node + 1]
+        high = low + self._nodes[3 * node + 2]
+        while low < high:
+            middle = (low + high) // 2
+            if self._edges[2 * middle] < code:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._nodes[3 * node + 1] + self._nodes[3 * node + 2] and self._edges[2 * low] == code:
+            return self._edges[2 * low + 1]
+        return None
+
+    def matches(self, word:str) -> list:
+        """ Same as SuffixTrie.matches: (suffix, position) pairs in the order of the suffixes """
+        found = []
+        node = 0
+        for position in range(len(word) - 1, -1, -1):
+            node = self._child(node, word[position])
+            if node is None:
+                break
+            suffix_index = self._nodes[3 * node]
+            if suffix_index:
+                found.append((suffix_index - 1, position))
+        found.sort()
+        return [(self.suffixes[index], position) for index, position in found]
+
+
+class MappedLexicon(Lexicon):
+    """ stemmer.Lexicon read from the compiled file. Words and the suffix trie stay in the memory-mapped file,
+        they are not copied to Python objects. It is equal to the Lexicon it was compiled from.
+
+        param: path -> path of the file written by compile_lexicon
+    """
+    __slots__ = ('path', '_mmap')
+
+    def __init__(self, path:str):
+        if sys.byteorder != 'little':
+            raise RuntimeError('compiled lexicon can be used only on little-endian machines')
+
+        with open(path, 'rb') as lexicon_file:
+            mapped = mmap.mmap(lexicon_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a compiled lexicon file')
+
+        view = memoryview(mapped)
+        sections = {}
+        for index in range(count):
+            name, offset, length = _SECTION.unpack_from(mapped, _HEADER.size + index * _SECTION.size)
+            sections[name.rstrip(b'\0').decode('ascii')] = view[offset:offset + length]
+
+        meta = json.loads(bytes(sections['meta']))
+        if meta['format'] != FORMAT_VERSION:
+            raise ValueError(f'{path} has format {meta["format"]}, expected {FORMAT_VERSION}')
+
+        suffixes = tuple(MappedStringTable(sections['suffixes']))
+        object.__setattr__(self, 'path', path)
+        object.__setattr__(self, '_mmap', mapped)
+        object.__setattr__(self, 'words', MappedStringTable(sections['words']))
+        object.__setattr__(self, 'suffixes', suffixes)
+        object.__setattr__(self, 'suffix_trie', MappedSuffixTrie(suffixes, sections['trie_nodes'], sections['trie_edges']))
+        object.__setattr__(self, 'version', meta['version'])
+
+
+@lru_cache(maxsize=None)
+def load_compiled_lexicon(path:str) -> MappedLexicon:
+    """ Returns the compiled lexicon of the file, every file is mapped only once per process """
+    return MappedLexicon(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or inspect the compiled lexicon file.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='compile words and suffixes')
+    build.add_argument('-o', '--output', required=True, help='path of the compiled file')
+    build.add_argument('--words', default=WORDS_PATH, help='words file (default: words.txt next to stemmer.py)')
+    build.add_argument('--suffixes', default=SUFFIX_PATH, help='suffixes file (default: suffix.txt next to stemmer.py)')
+
+    info = commands.add_parser('info', help='print the metadata of the compiled file')
+    info.add_argument('path')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        compile_lexicon(args.output, Lexicon.from_files(args.words, args.suffixes))
+    else:
+        lexicon = MappedLexicon(args.path)
+        print(json.dumps({'version': lexicon.version, 'words': len(lexicon.words), 'suffixes': len(lexicon.suffixes)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
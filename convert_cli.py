@@ -0,0 +1,162 @@
+""" Command line tool that converts dates written with words to JSON lines.
+
+    Every input line (or CSV row) becomes one JSON object:
+        {"input": ..., "converted": ..., "year": ..., "month": ..., "day": ..., "iso": ..., "method": ...}
+
+    Examples:
+        cat dates.txt | python convert_cli.py > dates.jsonl
+        python convert_cli.py dates.csv --csv --column birth_date --keep-columns -o dates.jsonl
+
+    Input is read and converted in batches of fixed size, so memory does not grow with the size of the input.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from itertools import islice, tee
+
+from convert_extract import convert_batch, open_result_cache
+from date_fallback import FALLBACKS, set_fallback
+from parallel import convert_parallel
+
+# Number of the input lines converted together with convert_batch
+BATCH_SIZE = 1000
+
+# Size of the output buffer in bytes
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def read_lines(input_file):
+    """ Generator of the input lines without line endings
+
+        param: input_file -> opened text file
+
+        return: generator of (text, None) pairs, None stands for the absent CSV columns
+    """
+    for line in input_file:
+        yield line.rstrip('\r\n'), None
+
+
+def read_csv_rows(input_file, column:str = None):
+    """ Generator of the date column of the CSV file that has header row
+
+        param: input_file -> opened text file
+        param: column -> name of the column with dates, first column is used if it is None
+
+        return: generator of (text, row) pairs where row is dictionary of all columns of the CSV row
+    """
+    reader = csv.DictReader(input_file)
+    # header is checked before the first row is requested, so that wrong column name is reported immediately
+    if reader.fieldnames is None:
+        return iter(())
+    if column is None:
+        column = reader.fieldnames[0]
+    elif column not in reader.fieldnames:
+        raise ValueError(f'column {column!r} is not in the CSV header: {reader.fieldnames}')
+
+    return ((row[column] or '', row) for row in reader)
+
+
+def convert_stream(records, batch_size:int = BATCH_SIZE, workers:int = 1, cache_path:str = None):
+    """ Converts (text, row) pairs in batches and yields the results one by one in the input order
+
+        param: records -> iterable of (text, row) pairs, returned by read_lines or read_csv_rows
+        param: batch_size -> number of the records converted together
+        param: workers -> number of the processes, batches are converted by parallel.convert_parallel if it is more than 1
+        param: cache_path -> path of the persistent result cache file, see convert_extract.open_result_cache
+
+        return: generator of (result, row) pairs, result is dictionary returned by convert_batch
+    """
+    if workers > 1:
+        # rows stay in this process, only texts are sent to the workers
+        text_records, row_records = tee(records)
+        results = convert_parallel((text for text, row in text_records), workers, batch_size, cache_path)
+        yield from zip(results, (row for text, row in row_records))
+        return
+
+    cache = open_result_cache(cache_path) if cache_path is not None else None
+    try:
+        records = iter(records)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            results = convert_batch((text for text, row in batch), cache=cache)
+            yield from zip(results, (row for text, row in batch))
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def write_jsonl(results, output_file, keep_columns:bool = False) -> int:
+    """ Writes every result as one JSON line
+
+        param: results -> generator of (result, row) pairs returned by convert_stream
+        param: output_file -> opened text file
+        param: keep_columns -> add all columns of the CSV row to the output as "columns"
+
+        return: number of the written lines
+    """
+    count = 0
+    for result, row in results:
+        if keep_columns and row is not None:
+            result['columns'] = row
+        output_file.write(json.dumps(result, ensure_ascii=False))
+        output_file.write('\n')
+        count += 1
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Convert Azerbaijani dates written with words to JSON lines.')
+    parser.add_argument('input', nargs='?', default='-', help='input file, one date per line (default: stdin)')
+    parser.add_argument('-o', '--output', default='-', help='output JSONL file (default: stdout)')
+    parser.add_argument('--csv', action='store_true', help='input is CSV file with header row')
+    parser.add_argument('--column', help='name of the CSV column with dates (default: first column)')
+    parser.add_argument('--keep-columns', action='store_true', help='copy all CSV columns to the output as "columns"')
+    parser.add_argument('--batch-size', '--chunk-size', type=int, default=BATCH_SIZE, help=f'number of lines converted together (default: {BATCH_SIZE})')
+    parser.add_argument('--cache', help='SQLite file of the persistent result cache, it is created if it does not exist')
+    parser.add_argument('--fallback', choices=sorted(FALLBACKS),
+                        help='parser of the numerical dates not in the common formats (default: dateparser), it is passed to the workers as well')
+    parser.add_argument('--workers', type=int, default=1, help='number of worker processes (default: 1, 0 means number of CPUs)')
+    args = parser.parse_args(argv)
+
+    if args.fallback is not None:
+        # convert_parallel passes the backend to the worker processes
+        set_fallback(args.fallback)
+
+    if args.batch_size < 1:
+        parser.error('--batch-size must be positive')
+    if args.workers < 0:
+        parser.error('--workers must not be negative')
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+
+    if args.input == '-':
+        input_file = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='' if args.csv else None)
+    else:
+        input_file = open(args.input, 'r', encoding='utf-8', newline='' if args.csv else None)
+
+    if args.output == '-':
+        output_file = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, OUTPUT_BUFFER_SIZE), encoding='utf-8')
+    else:
+        output_file = open(args.output, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE)
+
+    with input_file, output_file:
+        if args.csv:
+            try:
+                records = read_csv_rows(input_file, args.column)
+            except ValueError as error:
+                parser.error(str(error))
+        else:
+            records = read_lines(input_file)
+
+        write_jsonl(convert_stream(records, args.batch_size, args.workers, args.cache), output_file, args.keep_columns)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
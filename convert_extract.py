@@ -1,12 +1,48 @@
 from difflib import get_close_matches
 import re
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+from collections import Counter
+from functools import lru_cache
 from stem_app import *
-import dateparser
+from fuzzy_match import FuzzyMatcher, MonthMatcher, SuffixNormalizer
+from numeric_date import parse_numeric_date
+from result_cache import ResultCache, normalize_text
+from token_cache import TokenAnalysisCache
+from records import DateResult, NUMERIC, Token, join_values
+from numerals import PhraseTable, date_phrases, parse_values
+from date_fallback import get_fallback, parse_fallback
+
+# Diagnostic output of the conversion, it is shown only if logging is configured for this logger
+logger = logging.getLogger(__name__)
+
+# How many numerical dates were parsed by parse_numeric_date ("numeric") and how many fell back to dateparser ("dateparser")
+numeric_date_stats = Counter()
+
+# How many texts took every branch of convert_splitted: "entities", "numeric" or "dateparser" (the last two are the is_three_numerical branch),
+# and how many times extract_entities found a second month ("month_conflict")
+branch_stats = Counter()
+
+# Version of the conversion code, it is a part of lexicon_version. Increase it with every change that changes the results,
+# so that the persistent result caches written by the older code are cleared:
+#   2 -> number words read by numerals.NumeralParser (typos in the number runs convert differently)
+#   3 -> compact numerical dates ("19920625", "199206/15") are parsed, only decimal digits are numbers
+#   4 -> numbers separated by spaces ("2001 12") are not compact numerical dates
+PIPELINE_VERSION = 4
 
 MONTHS = ['yanvar','fevral','mart','aprel','may','iyun','iyul','avqust','sentyabr','oktyabr','noyabr','dekabr']
 
+# Recognizes month names and their inflected forms (martın, aprelin, mayda) in one call
+month_matcher = MonthMatcher(MONTHS, cutoff=0.85)
+
 add_without_stem = [',','.',':','/','"',"'"]
 
+# Words and numbers or single punctuation characters of the input text
+TOKEN_PATTERN = re.compile(r'\b\w+\b|[^\w\s]')
+
 eliminate_list = ["0",'in']
 
 numbers = {'sifir':0,'bir':1,'iki':2,'üç':3,'üc':3,'uc':3,'uç':3,'üş':3,'uch':3,'dörd':4,'dört':4,'dord':4,'dort':4,'beş':5,'bes':5,'besin':5,
@@ -19,10 +55,18 @@ numbers = {'sifir':0,'bir':1,'iki':2,'üç':3,'üc':3,'uc':3,'uç':3,'üş':3,'u
            'doxsan':90,'dogsan':90,'doğsan':90,'yüz':100,'yuz':100,'yeddiyuz':700,'sekkizuz':800,'doqquzuz':900,
            'min':1000,'ikimin':2000}
 
+# Index of the numbers dictionary keys for finding close matches of the text numbers
+number_matcher = FuzzyMatcher(numbers, cutoff = 0.81)
+
+# (root, shortened suffix) of the stemmed tokens, shared by the whole run. Use token_cache.resize() to change its size
+token_cache = TokenAnalysisCache()
+
 
 suffix_shorten_dict  = {'inci':'ci','ıncı':'ci','üncü':'cu',"uncu":"cu",
                         'nci':'ci','ncı':'ci','ncü':'cu',"ncu":"cu"}
 
+# Shortens the suffixes with the suffix_shorten_dict, spellings of the ordinal suffixes are compared in advance
+suffix_normalizer = SuffixNormalizer(suffix_shorten_dict, cutoff = 0.7)
 
 
 def format_suffix(suffix:str,suffix_shorten_dict:dict) -> str:
@@ -37,6 +81,10 @@ def format_suffix(suffix:str,suffix_shorten_dict:dict) -> str:
         return: shorten form of the input suffix
     """
 
+    # the default dictionary is shortened by the precomputed table and the cached fuzzy matcher, see fuzzy_match.SuffixNormalizer
+    if suffix_shorten_dict is suffix_normalizer.shorten_dict:
+        return suffix_normalizer.normalize(suffix)
+
     close_match = get_close_matches(   
                                        suffix, 
                                        list(  suffix_shorten_dict.keys()  ),
@@ -75,38 +123,48 @@ def split_input(input_text:str,suffix_shortener_dict:dict) -> list:
 
     # Using regex to seperate words and numbers in the input text
     #* Such that, 1992, 06, 25 should turn to the -> ['1992', ','  ,  '06' , ','  , '25']
-    elems = re.findall(r'\b\w+\b|[^\w\s]', input_text) 
+    elems = TOKEN_PATTERN.findall(input_text)
 
     #creating new elements list for handling exceptional cases by looping over previous list
     new_elems_ls = []
-
     for elem in elems:
+        new_elems_ls += split_element(elem,suffix_shortener_dict)
 
-        # if element in the seperated elements list is in the numbers dictionary keys add it to the new list
-        # numbers dictionary is list of numbers we understand and we dont want to change them cos of we already know it is meaning
-        if elem in list(numbers.keys()):
-            new_elems_ls.append(elem)
+    return new_elems_ls
 
-        else:
-            
-            # Some elements we dont want to stem cos when we stem them they just disappear
-            # We stored those chars in the add_without_stem list the reason to do so, when we detect problems with the 
-            # stemming cases that it takes root of the word as a suffix we can add those words to the add_without_list so they
 
-            if elem in add_without_stem:
-                new_elems_ls.append(elem)
-            
-            #if element is in the list that we want to eliminate as an element we continue to the next iteration of the for loop
-            elif elem in eliminate_list:
-                continue
-            
-            #If those statements arent true we want to stem the word. Then add root and the shorten form of the suffix to the new_elems_ls
-            else:
-                
-                new_elems_ls += get_root_and_suffix(elem,suffix_shortener_dict)
-                
+def split_tokens(input_text:str,suffix_shortener_dict:dict) -> list:
+    """ Same as split_input but returns records.Token of every element, with the span of its source word in the lower cased input text.
+        Such that, "Ikinci ilin" -> [Token("iki", span=(0, 6)), Token("ci", span=(0, 6)), Token("il", span=(7, 11)), Token("in", span=(7, 11))]
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(input_text.lower()):
+        span = match.span()
+        for elem in split_element(match.group(),suffix_shortener_dict):
+            tokens.append(Token(elem, span=span))
+    return tokens
 
-    return new_elems_ls
+
+def split_element(elem:str,suffix_shortener_dict:dict) -> list:
+    """ Elements of one regex match of split_input: the element itself, nothing, or its root and shortened suffix """
+
+    # if element in the seperated elements list is in the numbers dictionary keys add it to the new list
+    # numbers dictionary is list of numbers we understand and we dont want to change them cos of we already know it is meaning
+    if elem in numbers:
+        return [elem]
+
+    # Some elements we dont want to stem cos when we stem them they just disappear
+    # We stored those chars in the add_without_stem list the reason to do so, when we detect problems with the 
+    # stemming cases that it takes root of the word as a suffix we can add those words to the add_without_list so they
+    if elem in add_without_stem:
+        return [elem]
+
+    #if element is in the list that we want to eliminate as an element we continue to the next element
+    if elem in eliminate_list:
+        return []
+
+    #If those statements arent true we want to stem the word. Then return root and the shorten form of the suffix
+    return get_root_and_suffix(elem,suffix_shortener_dict)
 
 def get_root_and_suffix(elem:str,suffix_shortener_dict:dict) -> list:
     """This function will get seperated element from the input text and stem it.
@@ -120,6 +178,20 @@ def get_root_and_suffix(elem:str,suffix_shortener_dict:dict) -> list:
 
     """
 
+    # analyses with the default suffix_shorten_dict are cached for the whole run, see token_cache
+    if suffix_shortener_dict is suffix_shorten_dict:
+        return list(token_cache.get(elem, _analyze_token))
+    return _root_and_suffix(elem, suffix_shortener_dict)
+
+
+def _analyze_token(elem:str) -> tuple:
+    """ Cached analysis of the element with the default suffix_shorten_dict """
+    return tuple(_root_and_suffix(elem, suffix_shorten_dict))
+
+
+def _root_and_suffix(elem:str,suffix_shortener_dict:dict) -> list:
+    """ Uncached get_root_and_suffix """
+
     root_suffix_ls = list()
 
     # to_stem function from stem_app returns seperated and stemmed words list from input. We give one element and expecting list with one element
@@ -140,17 +212,15 @@ def get_root_and_suffix(elem:str,suffix_shortener_dict:dict) -> list:
 
     return root_suffix_ls
 
-print('Test split input, input_text is "iki min ikinci ilin 1992, 25 on uch"',split_input('iki min ikinci ilin 1992, 25 on uch',suffix_shorten_dict))
-
 
 def is_three_numerical(seperated_input_list:list) -> bool:
     """Check whether there are three OR MORE digits in the converted input list.
-    Converted list example -> "iki min birinci il on besh aprel" will convert into ['2001','ci','il','15','aprel'].
+    Converted list example -> "iki min birinci il on besh aprel" will convert into tokens of ['2001','ci','il','15','aprel'].
     And this function will check whether in the abovementioned converted list whether there are three number or not.
     Reason behind it after we convert the splitted input list extract_entities function will try to extract numbers and months and three 
     digit in the list will be reason for error in the gotten entities so we want to detect dates with neural machine translation in this case.
 
-    param: seperated_input_list -> list that contain elements of the input text
+    param: seperated_input_list -> list of records.Token (or strings) of the input text, output of to_convert
 
     return type: Boolean
     return: False if there is not three numerical value ,     example => ['1992','ci','ilin','17','aprel','i']
@@ -158,247 +228,122 @@ def is_three_numerical(seperated_input_list:list) -> bool:
     """
 
     #add numericals in to the new list, Maybe we could need this list in future for improvements so we can return it as well in future
-    nums = [elem for elem in seperated_input_list if elem.isnumeric()]
+    tokens = [Token(token) if isinstance(token, str) else token for token in seperated_input_list]
+    nums = [token for token in tokens if token.kind == NUMERIC]
 
     # if length of numerical values list is equal or higher than 3 we will return true 
     if      len(nums) >= 3:       return True
     else:                         return False
 
-print("Test is three numerical: input list ['1992','17','alma','yemek'], output: ",is_three_numerical(['1992','17','alma','yemek']))   
 
+# Separators of the numerical dates, such that "1992.06.25", "199206/15" or "1992-06-25"
+DATE_SEPARATORS = frozenset(['.', '/', '-'])
 
-def convert_to_ints(splitted_input_ls:list)->tuple:
-    """
-    Convert text written numbers to the numerical texts.
-    Example: ["min","doqquz","yuz","on","besh"] -> ["1000","9","100","10","5"]
-    
-    param: splitted_input_ls -> splitted version of the input text with split_input function
 
-    return: same list as input list where numbers in the text format converted into numerical string element 
-            AND map of the whether some element was number that has been written in the form of text or not. Will be used for merging further
+def is_numerical_date(converted_ls:list) -> bool:
+    """ Whether the converted list is one compact numerical date: numbers written with digits and date separators
+        without any space in between, such that "19920625" or "199206/15" that have less than three numbers for is_three_numerical.
+        Numbers converted from words are not digits of the compact dates: "iki min bir on iki" is not 2020-01-12,
+        and numbers separated by spaces are not either: "2001 12" is not 2020-01-12.
+        Tokens without span touch only when there is one token
     """
-    print(splitted_input_ls)
-    #converted version will store here
-    new_ls = []
-
-    # for the elements text number like "bir","iki" we add 1 here if it in the another format add 0
-    # it will help us not merging text numbers with numbers that's been written with digits : Case-> iki min on 5 aprel 
-    map_numbers_texts = [] 
-
-    #loop over splitted_input_ls
-    for elem in splitted_input_ls:
-        # Get whether element is close to some of the keys by "cutoff" percentages in the numbers dictionary
-        close_matches = get_close_matches(      elem,
-                                                list(numbers.keys()),
-                                                cutoff = 0.81, n=1)
-        
-        # if we found close match we want to append to the new list
-        if close_matches:               
-            new_ls.append(  str(  numbers[close_matches[0]]  )  )    
-            map_numbers_texts.append(1)
-
-        # otherwise just add element so we can procced the logic further to merge numbers
-        else:                           
-            new_ls.append( str(elem) )
-            map_numbers_texts.append(0)
-            
-
-    print(new_ls)
-    return new_ls,map_numbers_texts
-
-print(f'Test convert_to_ints function input is: ["min","doqquz","yuz","on","besh"] output: {convert_to_ints(["min","doqquz","yuz","on","besh"])}')
-
-def handle_3_figure_numbers(converted_list:list,map_numbers_text:list) -> tuple:
-    """ During conversion process we get corrosponding numbers from text example -> ["min", "uch", "yuz", "besh"] -> ["1000","3","100","5"]
-        This function gets initial stage converted list and return it with merging three digit numbers,
-
-        Such that, 
-
-        Example input: ["1000","3","100","5"] -> output: ["1000","300","5"]
-
-        param: converted_list initial stage converted list -> example ["1000","3","100","5"]
-        param: map of the whether some element was number that has been written in the form of text or not: 
-        we get this map from convert_to_int function but we need to modify it here as well
-
-        returns: same list with handling 3 figure numbers
-    """
-    #new list that will contain three figures numbers in the merged form 
-    new_ls = []
-    #new map list cos we potentially connect two numbers and we should do same in the map list as well for not screwing out the conversion
-    new_map_numbers_list = []
-
-    # loop over initial stage converted list
-    for i,(elem,mask) in enumerate(zip(converted_list,map_numbers_text)):
-
-        # if we are not in the first element , and element is 100 we can possibly merge it with previous elem
-        if elem == '100' and i != 0:
-
-            # check whether previous element in the list is one figure number
-            if len(converted_list[i-1]) == 1:
-                #if it is merge them and add to the new list
-                new_ls[i-1] = (  
-                                str(  
-                                        int(elem)*int(converted_list[i-1])
-                              ))
-                new_map_numbers_list[i-1] = mask
-                
-            else: # that mean we are in the first element of the list 
-                new_ls.append(elem)# first element could be some other number as well 
-                new_map_numbers_list.append(mask)
-
-        else:
-            # there is nothing to merge 
-            new_ls.append(elem)
-            new_map_numbers_list.append(mask)
-    return new_ls,new_map_numbers_list
+    if not any(token.kind == NUMERIC for token in converted_ls):
+        return False
+    if not all((token.kind == NUMERIC and not token.is_text_number) or token.value in DATE_SEPARATORS for token in converted_ls):
+        return False
+    for previous, token in zip(converted_ls, converted_ls[1:]):
+        if previous.span is None or token.span is None or token.span[0] > previous.span[1]:
+            return False
+    return True
 
 
-print(f'Test handle_3_figure_numbers function input is: ["1000","3","100","5"] output: {handle_3_figure_numbers(["1000","3","100","5"],[0,0,0,0])}')
-
-
-def merge_two_num(num1:str,num2:str) -> str:
-    """Merging two numbers based on their length 10,5 will be merged like 15 but 2 1000 will be merged as 2000
-        param: num1 and num2 are two numbers that will be merged
-
-        return: merged version of the num1 and num2 as an string
+def to_convert(splitted_input_ls:list)->list:
     """
-    number_str = str()
-
-    # if previous length of the previous num is larger than curren number example num1 = 1000 num2 = 900 summirize them
-    if len(num1) > len(num2) :
-        number_str = str(int(num1)+int(num2))
-    # if length of the current number is larger than previous number example num1 = 2 num2 = 1000 multiply them it is only about 4 figures and 1 figure
-    elif len(num1) < len(num2) and len(num2)>= 3:
-        number_str = str(int(num1)*int(num2))
-    # otherwise return empty string we cannot merge those numbers
-    else:
-        number_str = ''
-    
-    return number_str
+    Converts the numbers written with words to the numerical text in one pass over the elements.
+    Every run of the consecutive elements close to some number words is converted at once: common runs of the dates
+    are found in the phrase table by one lookup, the other runs are read by numerals.NumeralParser, that merges
+    the number words by the grammar of the numbers. Any other element finishes the run.
 
+    Such that, ["min","doqquz","yuz","doxsan","besh","on","iki","dekabr"] -> ["1995","12","dekabr"]
+    and ["iki","min","on"] -> ["2010"] but ["iki","min",",","on"] -> ["2000",",","10"]
 
-def to_convert(splitted_input_ls:list)->list:
-    """
-    This function appears to be designed to handle numbers in a list that are expressed 
-    as strings and merge them together based on certain rules. It does this by first converting
-    the strings to integers and then processing them one at a time to determine whether 
-    they should be merged with the previous number or not.
+    Numbers that have been written with digits are never merged with text numbers : Case-> iki min on 5 aprel 
 
-    param: splitted_input_ls -> splitted_version of the input text to the list
+    param: splitted_input_ls -> splitted_version of the input text to the list, output of split_tokens or split_input
 
-    return: converted version of the list where text numbers converted to the numerical text
+    return: converted version of the list where text numbers converted to the numerical text, as list of records.Token.
+            is_text_number of the converted numbers is True, records.join_values of the list is the "converted" text of the result
     """
-
-    #preprocess the splitted input text
-    converted_ls,map_number_texts = convert_to_ints(splitted_input_ls)
-    converted_ls,map_number_texts = handle_3_figure_numbers(converted_ls,map_number_texts)
-    print(map_number_texts)
-    print(converted_ls)
-    #final converted version of the intially coverted list
+    logger.debug('to_convert input: %s', splitted_input_ls)
+    #final converted version of the input list
     new_converted_ls = []
-    #where final found numbers will store
-    founded_nums = []
-    #where we will store all the numbers we find while linearly searching through converted input list
-    all_nums = []
-    #store last founded num
-    found_num = ''
-    #set a mode within function that TODO
-    mode = 'safe'
-
-    #loop through converted input list 
-    for i,elem in enumerate(converted_ls):
-
-        # if element is numerical check further 
-        if elem.isnumeric():
-            
-            # if we have found new number previous iteration or we are strating to the search now we want to add
-            # current numerical elem to the <all_nums> and <found> variables to facilitate process further 
-            # so, we will not need smart merge for now 
-
-            if found_num != '' and all_nums: 
-                # The part below called SMART_MERGE
-
-
-                # cases like ['2000','3','10','5'] where found num is 2003 and we are lookin 10 elem now and 
-                # last element of the all_nums list is 3 which is smaller than 10 in length 
-                if len(found_num) > len(elem) and len(all_nums[-1]) < len(elem):
-
-                    #this statement means we have finished reading previous number 
-
-                    #We finished reading previous number, adding it to the founded_nums list
-                    founded_nums.append(found_num)
-                    # Add num to the final list
-                    new_converted_ls.append(found_num)
-
-                    #Now last founded num is element itself previous number is verrified that is it 
-                    found_num = elem
-                    all_nums.append(elem)
-
-                    #enable confuse mode so that in the further iterations number wont be added to the nums as an found_num inside 
-                    #else statement below
-                    mode = 'confuse'
-
-                # check if last found_num which potentially merged and created and last extracted num from converted list are not same size 
-                # with the numerical elem that we are dealing with now. We cannot merge 80 with 10 or 85 with 3 
-                if len(all_nums[-1]) != len(elem) and len(found_num) != len(elem) and map_number_texts[i] == map_number_texts[i-1] == 1:
-                    #last gotten number coming from this merge 
-                    found_num = merge_two_num(found_num,elem)
-                    # and elem to the all_nums
-                    all_nums.append(elem)
-
-                # we have ready written number or we have found and potentially merged total number previous iteration so now we are looking to the new number
-                else:
-                    
-                    #reset all_nums we found previous num we dont need parts of it 
-                    all_nums = []
-
-                    #if we are in the confusion mode we should not number that found until previous iteration such that we have added it above
-                    if found_num != '' and mode == 'safe':
-                        founded_nums.append(found_num)
-                        new_converted_ls.append(found_num)
-                    
-                    #conver mode to the safe mode again 
-                    mode = 'safe'
-                    #we have found num replace it current element that we are handling 
-                    found_num = elem
-                    # maybe this element is just one part of the total number so add it to the cleaned all_nums list
-                    all_nums.append(elem)
-
-            # we cannot SMART_MERGE just add element to the list potentially we can do smart merge further
-            # happens in the beggining or finding previous number or after some words in between numbers
-            else: 
-                found_num = elem
-                all_nums.append(elem)
+    # values and elements of the run of the number words we are reading
+    run_values = []
+    run_tokens = []
 
-        # current element is not numerical it is either word in between numbers or in the beggining or ending of the list 
-        # it all cases we cannot have non-numerical text in between number texts of the total number so we assume it is end of the number
-        # without assigning current elem to the found_num variable 
-        else:
-            #if we have found num until now it is that total number 
-            if found_num != '':
-                founded_nums.append(found_num)
-                new_converted_ls.append(found_num)
-
-            # adding non numerical element to the final wanted list
-            new_converted_ls.append(elem)
-            #reset we will look for new number
-            found_num = ''
-            all_nums = []
+    for token in splitted_input_ls:
+        if isinstance(token, str):
+            token = Token(token)
 
-    # after last iteration if we have found num which means we havent add it 
-    # if we added it, found_num would be empty string ('')
-    if found_num != '':
-        founded_nums.append(found_num) 
-        new_converted_ls.append(found_num) 
+        # Get whether element is close to some of the keys by "cutoff" percentages in the numbers dictionary
+        close_match = number_matcher.match(token.value)
 
-    return ' '.join(new_converted_ls)
+        # number word continues the run
+        if close_match is not None:
+            run_values.append(numbers[close_match])
+            run_tokens.append(token)
+        # any other element is the end of the run
+        else:
+            if run_tokens:
+                _append_run_numbers(run_values, run_tokens, new_converted_ls)
+                run_values = []
+                run_tokens = []
+            new_converted_ls.append(token)
+
+    # run at the end of the list
+    if run_tokens:
+        _append_run_numbers(run_values, run_tokens, new_converted_ls)
+
+    logger.debug('to_convert output: %s', new_converted_ls)
+    return new_converted_ls
+
+
+# Conversions of the runs of the number words common in the dates (numerals.date_phrases), built on the first use
+@lru_cache(maxsize=None)
+def get_phrase_table() -> PhraseTable:
+    return PhraseTable(date_phrases())
+
+
+def _append_run_numbers(run_values:list, run_tokens:list, converted_ls:list):
+    """ Appends the numbers of the run of the number words to converted_ls, every number spans its words """
+    values = tuple(run_values)
+    parsed = get_phrase_table().get(values)
+    if parsed is None:
+        parsed = parse_values(values)
+
+    position = 0
+    for index in range(0, len(parsed), 2):
+        number, words = parsed[index], parsed[index + 1]
+        first, last = run_tokens[position], run_tokens[position + words - 1]
+        span = None if first.span is None or last.span is None else (first.span[0], last.span[1])
+        converted_ls.append(Token(str(number), is_text_number=True, span=span))
+        position += words
+
+def _token_number(token:Token):
+    """ Integer value of the NUMERIC token, None for the other tokens and the values int() does not accept """
+    if token.kind != NUMERIC:
+        return None
+    try:
+        return int(token.value)
+    except ValueError:
+        return None
 
 def extract_entities(converted_list:list)->dict:
     """
     This function will extract the features it can and return them inside dictionary
     
-    param:converted_list is final version of converted list where all text format numbers
-    converted into numerical string 
+    param:converted_list is final version of converted list of records.Token (or strings) where all text format numbers
+    converted into numerical string, output of to_convert. Such that ['1995','12','dekabr'] -> {'year':'1995','day':'12','month':'dekabr'}
 
     return: Python dictionary that contains extracted dates
     """
@@ -406,9 +351,13 @@ def extract_entities(converted_list:list)->dict:
     entities_dict = dict()
 
     # iterate through converted list
-    for elem in converted_list:
+    for token in converted_list:
+        if isinstance(token, str):
+            token = Token(token)
+        elem = token.value
+        number = _token_number(token)
         # if element is numerical and bigger than 31 it is potentially indicating the year
-        if elem.isnumeric() and int(elem) > 31:
+        if number is not None and number > 31:
             # if it is 4 digit it is okay to add directly to the dict
             if len(elem) == 4:
                 entities_dict['year'] = elem
@@ -424,7 +373,7 @@ def extract_entities(converted_list:list)->dict:
                     entities_dict.pop('year')
 
         #if element is numerical and in between 0 and 31 it is potentially day
-        elif elem.isnumeric() and (0<int(elem)<=31):
+        elif number is not None and (0<number<=31):
             # if we have already day entity delete it we are not sure about it
             if 'day' in entities_dict.keys():
                 entities_dict.pop('day')
@@ -432,18 +381,21 @@ def extract_entities(converted_list:list)->dict:
                 entities_dict['day'] = elem
         
         # Find and add month as an entity
-        elif get_close_matches(elem,MONTHS,cutoff=0.85):
+        elif (month := month_matcher.match(elem)) is not None:
             if 'month' in entities_dict.keys():
-                print('FALLBACK')
+                branch_stats['month_conflict'] += 1
+                logger.debug('FALLBACK: second month %r, keeping %r', elem, entities_dict['month'])
 
             else:
-                entities_dict['month'] = get_close_matches(elem,MONTHS,cutoff=0.85)[0]
+                # month is tuple of the month name and its number
+                entities_dict['month'] = month[0]
             
         # if elem
     return entities_dict
 
 def extract_date_dateparser(text):
-    """Extracts a date from a string using the dateparser library.
+    """Extracts a date from a numerical string with the fallback backend, dateparser by default (see date_fallback).
+    dateparser is imported only when the first such date is parsed.
 
     Args:
         text (str): The string to extract the date from.
@@ -451,102 +403,212 @@ def extract_date_dateparser(text):
     Returns:
         str: The extracted date in ISO format (YYYY-MM-DD), or None if no date was found.
     """
+    return parse_fallback(text)
 
-    # Define a list of common date formats to try parsing the input text with
-    date_formats = date_formats = [
-            '%Y-%m-%d',     # 1992-06-15
-            '%d.%m.%Y',     # 15.06.1992
-            '%d/%m/%Y',     # 15/06/1992
-            '%m/%d/%Y',     # 06/15/1992
-            '%Y.%m.%d',     # 1992.06.15
-            '%Y/%m/%d',     # 1992/06/15
-            '%m.%d.%Y',     # 06.15.1992
-            '%m-%d-%Y',     # 06-15-1992   
-            '%m/%d/%y',     # 06/15/92
-            '%d.%m.%y',     # 15.06.92
-            '%d/%m/%y',     # 15/06/92
-            '%m.%d.%y',     # 06.15.92
-            '%m-%d-%y',     # 06-15-92
-            '%Y%m%d',       # 19920615
-            '%y%m%d',       # 920615
-            '%Y/%m/%d',     # 1992/06/15
-            '%Y%m/%d',      # 199206/15
-            '%Y-%m/%d',     # 1992-06/15
-            '%Y%m-%d',      # 199206-15
-            '%Y.%m/%d',     # 1992.06/15
-            '%Y-%m-%d',     # 1992-06-15T00:00:00Z
-            '%Y%m%dT%H%M%SZ',  # 19920615T080000Z
-            '%Y-%m-%dT%H:%M:%SZ', # 1992-06-15T08:00:00Z
-            '%Y-%m-%dT%H:%M:%S',  # 1992-06-15T08:00:00
-            '%Y-%m-%dT%H:%M',  # 1992-06-15T08:00
-            '%Y-%m-%dT%H',    # 1992-06-15T08
-        ]
-    # Attempt to parse the input text as a date using the defined date formats  
-    date = dateparser.parse(text, date_formats=date_formats)
-
-    # If a valid date was parsed, format it as YYYY-MM-DD and return it
-    if date is not None:
-        return date.strftime('%Y-%m-%d')
-    
-    # If parsing failed, return None
-    return None
+
+def extract_numeric_date(text:str, day_first:bool = None):
+    """ Extracts a date from the numerical string like "1992.06.25", "25/06/1992" or "19920625".
+        Common numerical formats are parsed by numeric_date.parse_numeric_date, only the rest is given to extract_date_dateparser.
+        numeric_date_stats counts how many times each of them was used.
+
+        param: text -> numerical date without spaces
+        param: day_first -> order of the day and the month when the year is written last, see parse_numeric_date
+
+        return: the extracted date in ISO format (YYYY-MM-DD), or None if no date was found
+    """
+    iso = parse_numeric_date(text, day_first)
+    if iso is not None:
+        numeric_date_stats['numeric'] += 1
+        return iso
+
+    numeric_date_stats['dateparser'] += 1
+    return extract_date_dateparser(text)
+
+
+def lexicon_version() -> str:
+    """ Hash of everything the conversion results depend on: PIPELINE_VERSION of the code, words.txt, suffix.txt, numbers, MONTHS,
+        suffix_shorten_dict and the name of the fallback backend (date_fallback).
+        It changes whenever one of them changes.
+    """
+    content = json.dumps([PIPELINE_VERSION, get_stemmer().lexicon.version, numbers, MONTHS, suffix_shorten_dict, get_fallback().name],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode('utf8')).hexdigest()
+
+
+def open_result_cache(path:str) -> ResultCache:
+    """ Opens persistent result cache for convert_batch, results of the other lexicon versions are deleted from it """
+    return ResultCache(path, lexicon_version())
 
 
 def format_entity_output(entity_dict):
     return f"{entity_dict['year']}:{entity_dict['month']}:{entity_dict['day']}"
 
-test_texts = ['iki yuz uchuncu ilin on besh marti','doxsan sekkizin on besh marti','iki min uch on doqquz aprel','min doqquzuz on iki iyirmi besh aprel ','min doqquzuz doxsan bes, bes may','doxsan doqquzuncu il yirmi bes aprel ','doxsan besh on uch avqust','min doqquz yuz besh on iki dekabr']
-
-while True:
-    test_text = str(input('Write date please: '))
-    print(test_text)
-    splited = split_input(test_text,suffix_shorten_dict)
-    converted = to_convert(splited)
-    print(f"Converted form {converted}")
+def entities_to_iso(entity_dict:dict):
+    """ Builds ISO date (YYYY-MM-DD) from the extracted entities
 
-    extracted_entities = extract_entities(converted.split(' '))
-    print(f'Extracted entities: ',extracted_entities)
+        param: entity_dict -> dictionary returned by extract_entities function
 
+        return: ISO date string or None if some entity is missing or the date does not exist
+    """
+    if not {'year','month','day'} <= entity_dict.keys():
+        return None
 
-    
-    if is_three_numerical(converted.split(' ')):
-        print('input',converted.replace(' ',''))
-        three_nums_extraction = extract_date_dateparser(converted.replace(" ", ""))
-        if three_nums_extraction != None:
-            print("OUTPUT: ",three_nums_extraction)
-        else: 
-            print('please write in a normal way')
-    else:
-        print(extracted_entities)
+    month_number = MONTHS.index(entity_dict['month']) + 1
+    try:
+        return datetime.date(int(entity_dict['year']), month_number, int(entity_dict['day'])).isoformat()
+    except ValueError:
+        return None
 
-    if extracted_entities == 3:
-        format_entity_output(extracted_entities)
 
-    print('\n\n\n\n')
+def convert_batch(texts, day_first:bool = None, cache:ResultCache = None) -> list:
+    """ Converts many input texts at once. Such that,
 
+        ["min doqquz yuz doxsan besh on iki dekabr", "1992.06.25"] -> 
+            [{"input": "min doqquz yuz doxsan besh on iki dekabr", "converted": "1995 12 dekabr", "year": 1995, "month": 12, "day": 12, "iso": "1995-12-12", "method": "entities"},
+             {"input": "1992.06.25", "converted": "1992 . 06 . 25", "year": 1992, "month": 6, "day": 25, "iso": "1992-06-25", "method": "numeric"}]
 
+        Every distinct text is converted only once and the stemming and fuzzy matching caches are shared by the whole batch.
+        Texts with three or more numbers are parsed with parse_numeric_date, the ones it can not parse are parsed with 
+        dateparser after the other texts, once for every distinct numerical form.
 
-    
+        param: texts -> iterable of the input texts
+        param: day_first -> order of the day and the month in numerical dates like "05.06.1992", see parse_numeric_date
+        param: cache -> optional persistent cache opened with open_result_cache, texts found there are not converted again
+                        and new results are stored there
 
+        return: list of the result dictionaries in the order of the input texts.
+                method is "entities" if the date is built from extract_entities, "numeric" if it is parsed by parse_numeric_date
+                and "dateparser" if it is parsed by extract_date_dateparser
+    """
+    # input texts in their order and results of the distinct texts
+    order = list(texts)
+    results = {}
+    # distinct numerical forms that will be parsed by dateparser, mapped to the results that are waiting for them
+    pending_dateparser = {}
 
+    # results of the earlier runs
+    if cache is not None:
+        cache_keys = {text: _cache_key(text, day_first) for text in dict.fromkeys(order)}
+        cached_results = cache.get_many(set(cache_keys.values()))
+        for text, key in cache_keys.items():
+            if key in cached_results:
+                results[text] = DateResult(text, **cached_results[key])
+    new_texts = [text for text in dict.fromkeys(order) if text not in results]
 
+    for text in new_texts:
+        results[text] = convert_splitted(text, split_tokens(text,suffix_shorten_dict), day_first, pending_dateparser)
 
+    # one dateparser pass over the distinct numerical forms
+    resolve_pending_dateparser(pending_dateparser)
 
+    if cache is not None:
+        cache.put_many({cache_keys[text]: {key: value for key, value in results[text].to_dict().items() if key != 'input'} for text in new_texts})
 
+    # every row gets its own dictionary so that duplicates do not share the same one
+    return [results[text].to_dict() for text in order]
 
-                    
 
+def _cache_key(text:str, day_first:bool) -> str:
+    """ Key of the text in the result cache, results depend on the day_first policy as well """
+    return f'{day_first}\t{normalize_text(text)}'
 
-                    
 
+def convert_splitted(text:str, splited:list, day_first:bool = None, pending_dateparser:dict = None) -> DateResult:
+    """ Converts the output of split_tokens (or split_input) to the result of convert_batch.
 
+        param: text -> input text, stored as "input" of the result
+        param: splited -> split_tokens or split_input output of the text
+        param: day_first -> order of the day and the month in numerical dates, see parse_numeric_date
+        param: pending_dateparser -> if it is given, numerical forms that need dateparser are added to it (numerical form -> list of results)
+                                     and their result is filled later by the caller, otherwise dateparser is called immediately
 
+        return: records.DateResult, its to_dict() is the result dictionary of convert_batch
+    """
+    converted_ls = to_convert(splited)
+    result = DateResult(text, join_values(converted_ls))
+
+    if is_three_numerical(converted_ls):
+        numerical_text = ''.join([token.value for token in converted_ls])
+        iso = parse_numeric_date(numerical_text, day_first)
+        if iso is not None:
+            numeric_date_stats['numeric'] += 1
+            result.method = 'numeric'
+            result.set_iso(iso)
+        else:
+            result.method = 'dateparser'
+            if pending_dateparser is None:
+                numeric_date_stats['dateparser'] += 1
+                result.set_iso(extract_date_dateparser(numerical_text))
+            else:
+                pending_dateparser.setdefault(numerical_text, []).append(result)
+    elif is_numerical_date(converted_ls) and (iso := parse_numeric_date(''.join([token.value for token in converted_ls]), day_first)) is not None:
+        # compact numerical dates, the other short numerical texts are read as entities
+        numeric_date_stats['numeric'] += 1
+        result.method = 'numeric'
+        result.set_iso(iso)
+    else:
+        result.method = 'entities'
+        extracted_entities = extract_entities(converted_ls)
+        result.year = int(extracted_entities['year']) if 'year' in extracted_entities else None
+        result.month = MONTHS.index(extracted_entities['month']) + 1 if 'month' in extracted_entities else None
+        result.day = int(extracted_entities['day']) if 'day' in extracted_entities else None
+        result.iso = entities_to_iso(extracted_entities)
 
+    branch_stats[result.method] += 1
+    return result
 
 
+def resolve_pending_dateparser(pending_dateparser:dict):
+    """ Parses every numerical form collected by convert_splitted with dateparser once and fills the results waiting for it """
+    for numerical_text, waiting_results in pending_dateparser.items():
+        numeric_date_stats['dateparser'] += 1
+        iso = extract_date_dateparser(numerical_text)
+        for result in waiting_results:
+            result.set_iso(iso)
 
+test_texts = ['iki yuz uchuncu ilin on besh marti','doxsan sekkizin on besh marti','iki min uch on doqquz aprel','min doqquzuz on iki iyirmi besh aprel ','min doqquzuz doxsan bes, bes may','doxsan doqquzuncu il yirmi bes aprel ','doxsan besh on uch avqust','min doqquz yuz besh on iki dekabr']
 
+def main(argv=None):
+    """ Interactive loop that asks for a date and prints every stage of the conversion.
+        Run it as: python convert_extract.py [-v]
+    """
+    parser = argparse.ArgumentParser(description='Convert Azerbaijani dates written with words interactively.')
+    parser.add_argument('-v','--verbose',action='store_true',help='print diagnostic output of the conversion')
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(format='%(name)s: %(message)s')
+        logger.setLevel(logging.DEBUG)
+
+    while True:
+        try:
+            test_text = str(input('Write date please: '))
+        except (EOFError, KeyboardInterrupt):
+            break
+        print(test_text)
+        splited = split_tokens(test_text,suffix_shorten_dict)
+        converted_ls = to_convert(splited)
+        print(f"Converted form {join_values(converted_ls)}")
+
+        extracted_entities = extract_entities(converted_ls)
+        print(f'Extracted entities: ',extracted_entities)
+
+        if is_three_numerical(converted_ls):
+            numerical_text = ''.join([token.value for token in converted_ls])
+            print('input',numerical_text)
+            three_nums_extraction = extract_numeric_date(numerical_text)
+            if three_nums_extraction != None:
+                print("OUTPUT: ",three_nums_extraction)
+            else: 
+                print('please write in a normal way')
+        else:
+            print(extracted_entities)
 
+        if extracted_entities == 3:
+            format_entity_output(extracted_entities)
 
+        print('\n\n\n\n')
 
 
+if __name__ == '__main__':
+    main()
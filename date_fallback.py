@@ -0,0 +1,145 @@
+""" Fallback parsers of the numerical dates that numeric_date.parse_numeric_date can not parse.
+
+    Fallback is rare (the is_three_numerical branch of convert_splitted), so its backend is chosen by name
+    and dateparser, that takes most of the import time of the conversion, is imported only on its first parse:
+
+        dateparser -> dateparser.parse with DATE_FORMATS, the default
+        strptime   -> datetime.strptime with DATE_FORMATS only, no dependencies
+        none       -> fallback is disabled, such dates are not parsed
+
+    Backend is set with the DATE_TRANSLATION_FALLBACK environment variable or with set_fallback(), parallel.convert_parallel
+    passes the current backend to its worker processes. Any object with "name" and parse(text) -> ISO date or None can be set
+    as the backend, it must be picklable to reach the worker processes.
+"""
+import datetime
+import os
+import threading
+
+# Environment variable with the name of the fallback backend
+FALLBACK_ENV = "DATE_TRANSLATION_FALLBACK"
+
+# Backend used when the environment variable is not set
+DEFAULT_FALLBACK = 'dateparser'
+
+# Common date formats the fallback tries to parse the input text with
+DATE_FORMATS = [
+        '%Y-%m-%d',     # 1992-06-15
+        '%d.%m.%Y',     # 15.06.1992
+        '%d/%m/%Y',     # 15/06/1992
+        '%m/%d/%Y',     # 06/15/1992
+        '%Y.%m.%d',     # 1992.06.15
+        '%Y/%m/%d',     # 1992/06/15
+        '%m.%d.%Y',     # 06.15.1992
+        '%m-%d-%Y',     # 06-15-1992
+        '%m/%d/%y',     # 06/15/92
+        '%d.%m.%y',     # 15.06.92
+        '%d/%m/%y',     # 15/06/92
+        '%m.%d.%y',     # 06.15.92
+        '%m-%d-%y',     # 06-15-92
+        '%Y%m%d',       # 19920615
+        '%y%m%d',       # 920615
+        '%Y/%m/%d',     # 1992/06/15
+        '%Y%m/%d',      # 199206/15
+        '%Y-%m/%d',     # 1992-06/15
+        '%Y%m-%d',      # 199206-15
+        '%Y.%m/%d',     # 1992.06/15
+        '%Y-%m-%d',     # 1992-06-15T00:00:00Z
+        '%Y%m%dT%H%M%SZ',  # 19920615T080000Z
+        '%Y-%m-%dT%H:%M:%SZ', # 1992-06-15T08:00:00Z
+        '%Y-%m-%dT%H:%M:%S',  # 1992-06-15T08:00:00
+        '%Y-%m-%dT%H:%M',  # 1992-06-15T08:00
+        '%Y-%m-%dT%H',    # 1992-06-15T08
+    ]
+
+
+class DateparserFallback:
+    """ Parses the date with dateparser.parse(text, date_formats=date_formats), dateparser is imported on the first parse """
+    name = 'dateparser'
+
+    def __init__(self, date_formats:list = DATE_FORMATS):
+        self.date_formats = list(date_formats)
+        self._parse = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """ Whether dateparser has been imported by this backend """
+        return self._parse is not None
+
+    def _load(self):
+        with self._lock:
+            if self._parse is None:
+                import dateparser
+                self._parse = dateparser.parse
+        return self._parse
+
+    def parse(self, text:str):
+        """ Date of the text in ISO format (YYYY-MM-DD), or None if no date was found """
+        parse = self._parse or self._load()
+        date = parse(text, date_formats=self.date_formats)
+        if date is not None:
+            return date.strftime('%Y-%m-%d')
+        return None
+
+
+class StrptimeFallback:
+    """ Parses the date with the first of the date_formats that datetime.strptime accepts.
+        It is the format step of dateparser without its language data, relative dates and time zones
+    """
+    name = 'strptime'
+
+    def __init__(self, date_formats:list = DATE_FORMATS):
+        self.date_formats = list(dict.fromkeys(date_formats))
+
+    def parse(self, text:str):
+        """ Date of the text in ISO format (YYYY-MM-DD), or None if no format matches """
+        for date_format in self.date_formats:
+            try:
+                return datetime.datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return None
+
+
+class NoFallback:
+    """ Disabled fallback, the dates that need it are not parsed """
+    name = 'none'
+
+    def parse(self, text:str):
+        return None
+
+
+# Backend name -> class of the backend
+FALLBACKS = {backend.name: backend for backend in (DateparserFallback, StrptimeFallback, NoFallback)}
+
+_fallback = None
+
+
+def make_fallback(name:str):
+    """ New backend by its name, one of FALLBACKS """
+    try:
+        return FALLBACKS[name]()
+    except KeyError:
+        raise ValueError(f'unknown fallback {name!r}, expected one of: {", ".join(FALLBACKS)}') from None
+
+
+def get_fallback():
+    """ Backend of the fallback, it is created from DATE_TRANSLATION_FALLBACK on the first call """
+    global _fallback
+    if _fallback is None:
+        _fallback = make_fallback(os.environ.get(FALLBACK_ENV) or DEFAULT_FALLBACK)
+    return _fallback
+
+
+def set_fallback(backend):
+    """ Sets the backend of the fallback
+
+        param: backend -> name of the backend (see FALLBACKS), object with "name" and parse(text), or None to use DATE_TRANSLATION_FALLBACK again
+    """
+    global _fallback
+    _fallback = make_fallback(backend) if isinstance(backend, str) else backend
+
+
+def parse_fallback(text:str):
+    """ Date of the numerical text in ISO format (YYYY-MM-DD) parsed by the current backend, or None """
+    return get_fallback().parse(text)
@@ -0,0 +1,225 @@
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+# Number of the fuzzy lookups kept in the cache of every matcher
+FUZZY_CACHE_SIZE = 4096
+
+
+class FuzzyMatcher:
+    """ Finds the closest word of a fixed vocabulary for the given word.
+        Returns the same match as difflib.get_close_matches(word, vocabulary, n=1, cutoff=cutoff)
+        but the vocabulary is indexed only once:
+
+            * words of the vocabulary are returned by one dict lookup
+            * only vocabulary words whose length can reach the cutoff are compared with SequenceMatcher
+            * results of the comparisons are kept in LRU cache
+
+        param: vocabulary -> words to match against, if it is dictionary its keys are used. Example: numbers dictionary
+        param: cutoff -> minimum similarity ratio for the match, same as in get_close_matches
+        param: cache_size -> number of the fuzzy lookups kept in the cache
+    """
+
+    def __init__(self, vocabulary, cutoff:float, cache_size:int = FUZZY_CACHE_SIZE):
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+
+        self.cutoff = cutoff
+        # words in the order of the vocabulary and set of them for exact hits
+        self.words = tuple(vocabulary)
+        self._word_set = frozenset(self.words)
+
+        # vocabulary words grouped by their length
+        self._by_length = {}
+        for word in self.words:
+            self._by_length.setdefault(len(word), []).append(word)
+
+        self._fuzzy_match = lru_cache(maxsize=cache_size)(self._find_close_match)
+
+    def match(self, word:str):
+        """ Returns the closest vocabulary word for the word or None if nothing is close enough """
+
+        # every word is the closest match of itself
+        if word in self._word_set:
+            return word
+        return self._fuzzy_match(word)
+
+    def cache_info(self):
+        """ Statistics of the fuzzy lookups cache, same as functools.lru_cache().cache_info() """
+        return self._fuzzy_match.cache_info()
+
+    def cache_clear(self):
+        self._fuzzy_match.cache_clear()
+
+    def _candidates(self, length:int) -> list:
+        """ Vocabulary words whose length does not make similarity ratio lower than cutoff.
+            Ratio can not be higher than 2*min(len(a),len(b)) / (len(a)+len(b)), that is SequenceMatcher.real_quick_ratio
+        """
+        candidates = []
+        for word_length, words in self._by_length.items():
+            total = length + word_length
+            upper_bound = 2.0 * min(length, word_length) / total if total else 1.0
+            if upper_bound >= self.cutoff:
+                candidates += words
+        return candidates
+
+    def _find_close_match(self, word:str):
+        """ Same comparison as in difflib.get_close_matches with n=1, restricted to the length candidates """
+
+        best = None
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        for candidate in self._candidates(len(word)):
+            matcher.set_seq1(candidate)
+            if matcher.quick_ratio() >= self.cutoff:
+                score = matcher.ratio()
+                # ties are resolved as in get_close_matches, by the larger word
+                if score >= self.cutoff and (best is None or (score, candidate) > best):
+                    best = (score, candidate)
+
+        return best[1] if best is not None else None
+
+
+# Vowels of the back row, the rest of the vowels are front vowels
+BACK_VOWELS = 'aıou'
+VOWELS = 'aıoueəiöü'
+
+# Case endings that are added to the month names, "I" is replaced by ı/i/u/ü and "A" by a/ə according to vowel harmony
+# Example: mart -> martı, martın, marta, martda, martdan, martına, martında
+MONTH_ENDINGS = ['I','In','A','dA','dAn','InA','IndA','IndAn']
+
+# Letters that are usually typed with latin letters instead of the azerbaijani ones
+ASCII_LETTERS = str.maketrans({'ı':'i','ə':'e','ü':'u','ö':'o','ş':'s','ç':'c','ğ':'g'})
+
+
+def month_forms(month:str) -> list:
+    """ Inflected forms of the month name.
+        Example: "aprel" -> ["apreli", "aprelin", "aprelə", "apreldə", ..., "aprele", "aprelde", ...]
+
+        param: month -> month name, example "aprel"
+
+        return: list of the inflected forms with their latin spellings as well
+    """
+    last_vowel = [char for char in month if char in VOWELS][-1]
+
+    # four-fold and two-fold vowel harmony
+    if last_vowel in 'aı':      four_fold = 'ı'
+    elif last_vowel in 'ou':    four_fold = 'u'
+    elif last_vowel in 'öü':    four_fold = 'ü'
+    else:                       four_fold = 'i'
+    two_fold = 'a' if last_vowel in BACK_VOWELS else 'ə'
+
+    forms = [month + ending.replace('I',four_fold).replace('A',two_fold) for ending in MONTH_ENDINGS]
+    forms += [form.translate(ASCII_LETTERS) for form in forms]
+
+    return list(dict.fromkeys(forms))
+
+
+class MonthMatcher:
+    """ Recognizes month names with one call.
+        Inflected forms of the months are found by one dict lookup, other words are matched with
+        fuzzy lookup in the same way as difflib.get_close_matches(word, months, cutoff=cutoff).
+        Words that are too short or too long to be close to any month are rejected by the fuzzy matcher without comparison.
+
+        param: months -> month names in the order of the calendar
+        param: cutoff -> minimum similarity ratio for the fuzzy match
+    """
+
+    def __init__(self, months:list, cutoff:float, cache_size:int = FUZZY_CACHE_SIZE):
+        self.months = tuple(months)
+        self._matcher = FuzzyMatcher(self.months, cutoff, cache_size)
+
+        # month names and their inflected forms mapped to the month name
+        self._forms = {}
+        for month in self.months:
+            self._forms[month] = month
+            for form in month_forms(month):
+                self._forms.setdefault(form, month)
+
+    def match(self, word:str):
+        """ Returns tuple of (month name, month number) for the word or None if the word is not a month.
+            Example: "aprelin" -> ("aprel", 4)
+        """
+        month = self._forms.get(word)
+        if month is None:
+            month = self._matcher.match(word)
+            if month is None:
+                return None
+        return month, self.months.index(month) + 1
+
+    def cache_info(self):
+        return self._matcher.cache_info()
+
+    def cache_clear(self):
+        self._matcher.cache_clear()
+
+
+def ordinal_suffix_variants() -> list:
+    """ Spellings of the ordinal suffixes: four vowels of the four-fold harmony on both sides (inci, ıncı, uncu, üncü, incu ...),
+        with "c" typed as "c", "ç" or "j" (unju, inji) and without the first vowel after the words ending with a vowel (nci, ncı, nju ...)
+    """
+    variants = []
+    for consonant in 'cçj':
+        for last in 'iıuü':
+            variants.append('n' + consonant + last)
+            variants += [first + 'n' + consonant + last for first in 'iıuü']
+    return variants
+
+
+class SuffixNormalizer:
+    """ Shortens the suffixes stripped by the stemmer, same as
+        shorten_dict[difflib.get_close_matches(suffix, shorten_dict, cutoff=cutoff)[0]] or the suffix itself if nothing is close.
+
+            * spellings of the ordinal suffixes (ordinal_suffix_variants) are compared in advance and found by one dict lookup
+            * other suffixes ("in", "i", "ın" ...) go to the fuzzy matcher of the shorten_dict keys, its results are kept in LRU cache
+
+        param: shorten_dict -> long versions of the suffixes mapped to the shortened ones. Example: {"inci": "ci"}
+        param: cutoff -> minimum similarity ratio for the fuzzy match
+        param: variants -> suffixes shortened in advance, the ordinal suffix spellings by default
+    """
+
+    def __init__(self, shorten_dict:dict, cutoff:float = 0.7, cache_size:int = FUZZY_CACHE_SIZE, variants = None):
+        self.shorten_dict = shorten_dict
+        self._matcher = FuzzyMatcher(shorten_dict, cutoff, cache_size)
+
+        # suffixes shortened in advance
+        self._table = {}
+        for suffix in list(shorten_dict) + (ordinal_suffix_variants() if variants is None else list(variants)):
+            self._table[suffix] = self._shorten(suffix)
+        # the cache and its statistics are left for the suffixes out of the table
+        self._matcher.cache_clear()
+
+        # how many suffixes were found in the table and how many went to the fuzzy matcher
+        self.exact_hits = 0
+        self.fuzzy_lookups = 0
+
+    def _shorten(self, suffix:str) -> str:
+        match = self._matcher.match(suffix)
+        return suffix if match is None else self.shorten_dict[match]
+
+    def normalize(self, suffix:str) -> str:
+        """ Returns the shortened suffix, or the suffix itself if it is not close to any key. Example: "unju" -> "cu", "in" -> "in" """
+        shortened = self._table.get(suffix)
+        if shortened is not None:
+            self.exact_hits += 1
+            return shortened
+        self.fuzzy_lookups += 1
+        return self._shorten(suffix)
+
+    def stats(self) -> dict:
+        """ Lookups of the table ("exact"), lookups that went to the fuzzy matcher ("fuzzy")
+            and the fuzzy lookups not found in its cache, that is the SequenceMatcher comparisons ("fuzzy_computed")
+        """
+        return {'exact': self.exact_hits, 'fuzzy': self.fuzzy_lookups, 'fuzzy_computed': self._matcher.cache_info().misses}
+
+    def cache_info(self):
+        """ Statistics of the fuzzy lookups cache, same as functools.lru_cache().cache_info() """
+        return self._matcher.cache_info()
+
+    def cache_clear(self):
+        """ Empties the fuzzy lookups cache and resets the statistics """
+        self._matcher.cache_clear()
+        self.exact_hits = 0
+        self.fuzzy_lookups = 0
+
+    def __len__(self):
+        return len(self._table)
@@ -0,0 +1,227 @@
+""" Opt-in instrumentation of the conversion pipeline.
+
+    enable() wraps the stage functions with timers and disable() puts the original functions back,
+    so nothing is measured and nothing costs anything while the metrics are disabled.
+
+        import metrics
+        metrics.enable()
+        convert_batch(texts)
+        metrics.snapshot()          # dictionary of the stages, caches, branches and stem depths
+        metrics.prometheus_text()   # the same in Prometheus text format
+
+    Stage times include the instrumented stages they call, such that split_tokens includes get_root_and_suffix.
+    Only calls through the module attributes are measured, names imported with "from convert_extract import ..."
+    before enable() keep the original functions.
+"""
+import threading
+from collections import Counter, deque
+from time import perf_counter
+
+import convert_extract
+import fuzzy_match
+import stemmer
+
+# Stage name -> (owner, attribute name) of the instrumented function
+STAGES = {
+    'split_input': (convert_extract, 'split_input'),
+    'split_tokens': (convert_extract, 'split_tokens'),
+    'get_root_and_suffix': (convert_extract, 'get_root_and_suffix'),
+    'stem_word': (stemmer.Stemmer, 'stem_word'),
+    'fuzzy_match': (fuzzy_match.FuzzyMatcher, 'match'),
+    'to_convert': (convert_extract, 'to_convert'),
+    'extract_entities': (convert_extract, 'extract_entities'),
+    'extract_date_dateparser': (convert_extract, 'extract_date_dateparser'),
+}
+
+# Number of the latest durations of every stage kept for the percentiles
+SAMPLE_SIZE = 10000
+
+# Percentiles of the stage durations in the snapshot
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Upper bounds of the buckets of the stem depth histogram, the same in every scrape, deeper searches count only in "+Inf"
+STEM_DEPTH_BUCKETS = tuple(range(9))
+
+# Prefix of the Prometheus metric names
+PROMETHEUS_PREFIX = 'date_translation'
+
+_lock = threading.Lock()
+_originals = {}
+_stem_depths = Counter()
+
+
+class StageStats:
+    """ Calls, total time and the latest durations of one stage """
+    __slots__ = ('calls', 'total', 'samples')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def clear(self):
+        with _lock:
+            self.calls = 0
+            self.total = 0.0
+            self.samples.clear()
+
+    def record(self, seconds:float):
+        with _lock:
+            self.calls += 1
+            self.total += seconds
+            self.samples.append(seconds)
+
+    def quantiles(self) -> dict:
+        """ Nearest-rank percentiles of the latest durations """
+        with _lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return {quantile: 0.0 for quantile in QUANTILES}
+        return {quantile: samples[min(len(samples) - 1, int(quantile * len(samples)))] for quantile in QUANTILES}
+
+
+_stages = {stage: StageStats() for stage in STAGES}
+
+
+def _timed(function, stats:StageStats):
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(perf_counter() - start)
+    timed.__name__ = function.__name__
+    timed.__doc__ = function.__doc__
+    timed.__wrapped__ = function
+    return timed
+
+
+def _record_depth(depth:int):
+    with _lock:
+        _stem_depths[depth] += 1
+
+
+def enable():
+    """ Starts measuring, the stage functions are replaced with the timed ones """
+    with _lock:
+        if _originals:
+            return
+        for stage, (owner, name) in STAGES.items():
+            function = owner.__dict__[name]
+            _originals[stage] = function
+            setattr(owner, name, _timed(function, _stages[stage]))
+        stemmer.depth_observer = _record_depth
+
+
+def disable():
+    """ Stops measuring and puts the original stage functions back, the collected metrics are kept """
+    with _lock:
+        for stage, function in _originals.items():
+            owner, name = STAGES[stage]
+            setattr(owner, name, function)
+        _originals.clear()
+        stemmer.depth_observer = None
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset():
+    """ Deletes the collected metrics and the counters of the branches, statistics of the caches are not changed """
+    for stats in _stages.values():
+        stats.clear()
+    with _lock:
+        _stem_depths.clear()
+        convert_extract.branch_stats.clear()
+
+
+def _cache_stats(info) -> dict:
+    lookups = info.hits + info.misses
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0}
+
+
+def snapshot() -> dict:
+    """ All metrics as a JSON serializable dictionary:
+
+            enabled -> whether the stages are measured now
+            stages -> {stage: {calls, total_seconds, mean_seconds, p50_seconds, p90_seconds, p99_seconds}}
+            caches -> {cache: {hits, misses, size, maxsize, hit_rate}}, misses of the matchers are the fuzzy searches
+            branches -> texts converted by every branch of convert_splitted and the month conflicts of extract_entities
+            stem_depth -> {number of the removed suffixes: number of the stem searches}
+            suffixes -> shortened suffixes found in the precomputed table ("exact"), sent to the fuzzy matcher ("fuzzy")
+                        and compared with SequenceMatcher ("fuzzy_computed"), see fuzzy_match.SuffixNormalizer.stats
+    """
+    stages = {}
+    for stage, stats in _stages.items():
+        stage_snapshot = {'calls': stats.calls, 'total_seconds': stats.total,
+                          'mean_seconds': stats.total / stats.calls if stats.calls else 0.0}
+        for quantile, seconds in stats.quantiles().items():
+            stage_snapshot[f'p{round(quantile * 100)}_seconds'] = seconds
+        stages[stage] = stage_snapshot
+
+    caches = {
+        'token_cache': _cache_stats(convert_extract.token_cache.cache_info()),
+        'stem_cache': _cache_stats(stemmer.longest_stem.cache_info()),
+        'number_matcher': _cache_stats(convert_extract.number_matcher.cache_info()),
+        'month_matcher': _cache_stats(convert_extract.month_matcher.cache_info()),
+        'suffix_normalizer': _cache_stats(convert_extract.suffix_normalizer.cache_info()),
+    }
+
+    with _lock:
+        stem_depth = dict(sorted(_stem_depths.items()))
+    branches = {branch: convert_extract.branch_stats[branch] for branch in ('entities', 'numeric', 'dateparser', 'month_conflict')}
+    return {'enabled': is_enabled(), 'stages': stages, 'caches': caches, 'branches': branches, 'stem_depth': stem_depth,
+            'suffixes': convert_extract.suffix_normalizer.stats()}
+
+
+def prometheus_text(metrics:dict = None) -> str:
+    """ Metrics in Prometheus text exposition format
+
+        param: metrics -> snapshot() to format, the current snapshot by default
+    """
+    if metrics is None:
+        metrics = snapshot()
+    prefix = PROMETHEUS_PREFIX
+    lines = []
+
+    def family(name, kind, description):
+        lines.append(f'# HELP {prefix}_{name} {description}')
+        lines.append(f'# TYPE {prefix}_{name} {kind}')
+
+    family('stage_seconds', 'summary', 'Wall time of the pipeline stages, quantiles of the latest calls')
+    for stage, stats in metrics['stages'].items():
+        for quantile in QUANTILES:
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[f"p{round(quantile * 100)}_seconds"]!r}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]!r}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["calls"]}')
+
+    family('cache_hits_total', 'counter', 'Lookups found in the cache')
+    for cache, stats in metrics['caches'].items():
+        lines.append(f'{prefix}_cache_hits_total{{cache="{cache}"}} {stats["hits"]}')
+    family('cache_misses_total', 'counter', 'Lookups not found in the cache')
+    for cache, stats in metrics['caches'].items():
+        lines.append(f'{prefix}_cache_misses_total{{cache="{cache}"}} {stats["misses"]}')
+    family('cache_size', 'gauge', 'Entries in the cache')
+    for cache, stats in metrics['caches'].items():
+        lines.append(f'{prefix}_cache_size{{cache="{cache}"}} {stats["size"]}')
+
+    family('branch_total', 'counter', 'Texts converted by every branch and month conflicts')
+    for branch, count in metrics['branches'].items():
+        lines.append(f'{prefix}_branch_total{{branch="{branch}"}} {count}')
+
+    family('suffix_lookups_total', 'counter', 'Shortened suffixes by the lookup path: precomputed table, fuzzy matcher and SequenceMatcher comparisons')
+    for path, count in metrics['suffixes'].items():
+        lines.append(f'{prefix}_suffix_lookups_total{{path="{path}"}} {count}')
+
+    family('stem_depth', 'histogram', 'Most suffixes removed in one path of the stem searches')
+    depths = metrics['stem_depth']
+    for bound in STEM_DEPTH_BUCKETS:
+        cumulative = sum(count for depth, count in depths.items() if depth <= bound)
+        lines.append(f'{prefix}_stem_depth_bucket{{le="{bound}"}} {cumulative}')
+    lines.append(f'{prefix}_stem_depth_bucket{{le="+Inf"}} {sum(depths.values())}')
+    lines.append(f'{prefix}_stem_depth_sum {sum(depth * count for depth, count in depths.items())}')
+    lines.append(f'{prefix}_stem_depth_count {sum(depths.values())}')
+
+    return '\n'.join(lines) + '\n'
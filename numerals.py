@@ -0,0 +1,295 @@
+""" Azerbaijani number words.
+
+    number_to_words(1995) -> "min doqquz yüz doxsan beş"
+    ordinal_to_words(1995) -> "min doqquz yüz doxsan beşinci"
+"""
+import sys
+
+UNITS = ['', 'bir', 'iki', 'üç', 'dörd', 'beş', 'altı', 'yeddi', 'səkkiz', 'doqquz']
+
+TENS = ['', 'on', 'iyirmi', 'otuz', 'qırx', 'əlli', 'altmış', 'yetmiş', 'səksən', 'doxsan']
+
+HUNDRED = 'yüz'
+
+THOUSAND = 'min'
+
+ZERO = 'sıfır'
+
+
+def number_to_words(number:int) -> str:
+    """ Writes the number with words, such that 2003 -> "iki min üç", 100 -> "yüz", 1000 -> "min"
+
+        param: number -> integer in between 0 and 999999
+
+        return: number written with words separated by single space
+    """
+    if not 0 <= number < 1000000:
+        raise ValueError(f'number must be in between 0 and 999999: {number}')
+    if number == 0:
+        return ZERO
+
+    words = []
+    thousands, rest = divmod(number, 1000)
+    if thousands:
+        # "min" alone means one thousand, "bir min" is not used
+        if thousands > 1:
+            words += _below_thousand(thousands)
+        words.append(THOUSAND)
+    words += _below_thousand(rest)
+
+    return ' '.join(words)
+
+
+# Vowels of the ordinal suffix by the last vowel of the number (four-fold vowel harmony)
+ORDINAL_VOWELS = {'a': 'ı', 'ı': 'ı', 'o': 'u', 'u': 'u', 'ö': 'ü', 'ü': 'ü', 'e': 'i', 'ə': 'i', 'i': 'i'}
+
+
+def ordinal_to_words(number:int) -> str:
+    """ Writes the ordinal number with words, such that 1995 -> "min doqquz yüz doxsan beşinci", 2 -> "ikinci", 30 -> "otuzuncu"
+
+        param: number -> integer in between 0 and 999999
+
+        return: number_to_words of the number with the ordinal suffix of its last word
+    """
+    words = number_to_words(number)
+    vowel = ORDINAL_VOWELS[[char for char in words if char in ORDINAL_VOWELS][-1]]
+    # the first vowel of the suffix is dropped after a vowel: "iki" -> "ikinci", "altı" -> "altıncı"
+    if words[-1] in ORDINAL_VOWELS:
+        return f'{words}nc{vowel}'
+    return f'{words}{vowel}nc{vowel}'
+
+
+def _below_thousand(number:int) -> list:
+    """ Words of the number in between 0 and 999, zero is empty list """
+    words = []
+    hundreds, rest = divmod(number, 100)
+    if hundreds:
+        # "yüz" alone means one hundred, "bir yüz" is not used
+        if hundreds > 1:
+            words.append(UNITS[hundreds])
+        words.append(HUNDRED)
+    tens, units = divmod(rest, 10)
+    if tens:
+        words.append(TENS[tens])
+    if units:
+        words.append(UNITS[units])
+    return words
+
+
+# States of NumeralParser, named after the last filled part of the current number
+STATE_EMPTY = 'empty'
+STATE_THOUSANDS = 'thousands'
+STATE_HUNDREDS = 'hundreds'
+STATE_TENS = 'tens'
+STATE_UNITS = 'units'
+
+
+class NumeralParser:
+    """ Streaming parser of the numbers written with words. Values of the number words are given one by one
+        and the parser joins them by the grammar of the Azerbaijani numbers:
+
+            [[hundreds] [tens] [units]] min  [hundreds] [tens] [units]      hundreds = [units] yüz
+
+        The parts of one number must come in this order, a part that can not continue the current number
+        finishes it and starts a new one. Such that,
+
+            "min doqquz yüz doxsan beş on iki" -> 1995, 12       "iki min üç on doqquz" -> 2003, 19
+            "iki min on" -> 2010                                 "iki min" "," "on" -> 2000, 10 (finish() at the comma)
+
+        param: values of the words are 0, 1-9, 10-90, 100 ("yüz"), 200-900 ("doqquzuz"), 1000 ("min") or thousands ("ikimin")
+        Spans of the words are optional, the span of the finished number covers all its words.
+
+        Example:
+            parser = NumeralParser()
+            numbers = parser.push(1000, (0, 3)) + parser.push(9, (4, 10)) + parser.push(100, (11, 14)) + parser.finish()
+            # [(1900, (0, 14))]
+    """
+    __slots__ = ('state', 'thousands', 'hundreds', 'tens', 'units', 'span')
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.state = STATE_EMPTY
+        self.thousands = 0
+        self.hundreds = 0
+        self.tens = 0
+        self.units = 0
+        self.span = None
+
+    def push(self, value:int, span:tuple = None) -> list:
+        """ Adds the value of the next number word, returns list of the (number, span) pairs finished by it """
+        finished = []
+        state = self.state
+
+        if value == 0:
+            # zero is a number alone
+            finished = self.finish()
+            finished.append((0, span))
+            return finished
+
+        if value < 10:
+            if state == STATE_UNITS:
+                finished = self.finish()
+            self.units = value
+            self.state = STATE_UNITS
+
+        elif value < 100:
+            if state in (STATE_TENS, STATE_UNITS):
+                finished = self.finish()
+            self.tens = value
+            self.state = STATE_TENS
+
+        elif value == 100:
+            if state == STATE_UNITS and not self.hundreds and not self.tens:
+                # "üç yüz": the units are the multiplier of the hundred
+                self.hundreds = self.units * 100
+                self.units = 0
+            else:
+                if state not in (STATE_EMPTY, STATE_THOUSANDS):
+                    finished = self.finish()
+                self.hundreds = 100
+            self.state = STATE_HUNDREDS
+
+        elif value < 1000:
+            if state not in (STATE_EMPTY, STATE_THOUSANDS):
+                finished = self.finish()
+            self.hundreds = value
+            self.state = STATE_HUNDREDS
+
+        elif value == 1000:
+            if self.thousands:
+                finished = self.finish()
+            # "iki yüz min": the number below thousand is the multiplier of the thousand, "min" alone is one thousand
+            multiplier = self.hundreds + self.tens + self.units
+            self.thousands = (multiplier or 1) * 1000
+            self.hundreds = self.tens = self.units = 0
+            self.state = STATE_THOUSANDS
+
+        else:
+            if state != STATE_EMPTY:
+                finished = self.finish()
+            self.thousands = value
+            self.state = STATE_THOUSANDS
+
+        if span is not None:
+            self.span = span if self.span is None else (self.span[0], span[1])
+        return finished
+
+    def finish(self) -> list:
+        """ Finishes the current number, returns list with its (number, span) pair or empty list if there is not any """
+        if self.state == STATE_EMPTY:
+            return []
+        finished = [(self.thousands + self.hundreds + self.tens + self.units, self.span)]
+        self._reset()
+        return finished
+
+
+def parse_values(values) -> tuple:
+    """ Numbers NumeralParser reads from the values of the consecutive number words, with the number of the words of every number.
+        Result is flat tuple of (number, words) pairs, such that (1000, 9, 100, 90, 5, 10, 2) -> (1995, 5, 12, 2)
+    """
+    parser = NumeralParser()
+    parsed = []
+    for index, value in enumerate(values):
+        for number, (start, end) in parser.push(value, (index, index + 1)):
+            parsed += (number, end - start)
+    for number, (start, end) in parser.finish():
+        parsed += (number, end - start)
+    return tuple(parsed)
+
+
+def value_phrases(number:int) -> list:
+    """ Values of the number words of every common way to write the number in between 0 and 999999.
+        Such that 1900 -> [(1000, 9, 100), (1000, 900), (1, 1000, 9, 100), (1, 1000, 900)]
+        ("min doqquz yüz", "min doqquzuz", "bir min doqquz yüz", "bir min doqquzuz")
+    """
+    if not 0 <= number < 1000000:
+        raise ValueError(f'number must be in between 0 and 999999: {number}')
+    if number == 0:
+        return [(0,)]
+
+    thousands, rest = divmod(number, 1000)
+    if not thousands:
+        return _below_thousand_values(rest)
+
+    if thousands == 1:
+        # "min" and "bir min"
+        thousand_phrases = [(1000,), (1, 1000)]
+    else:
+        thousand_phrases = [phrase + (1000,) for phrase in _below_thousand_values(thousands)]
+        if thousands == 2:
+            # "ikimin"
+            thousand_phrases.append((2000,))
+    if not rest:
+        return thousand_phrases
+    return [thousand + phrase for thousand in thousand_phrases for phrase in _below_thousand_values(rest)]
+
+
+def _below_thousand_values(number:int) -> list:
+    """ value_phrases of the number in between 1 and 999 """
+    hundreds, rest = divmod(number, 100)
+    tens, units = divmod(rest, 10)
+    tail = tuple(value for value in (tens * 10, units) if value)
+    if not hundreds:
+        return [tail]
+    if hundreds == 1:
+        # "yüz" and "bir yüz"
+        hundred_phrases = [(100,), (1, 100)]
+    else:
+        hundred_phrases = [(hundreds, 100)]
+        if hundreds in (7, 8, 9):
+            # "yeddiyuz", "sekkizuz", "doqquzuz"
+            hundred_phrases.append((hundreds * 100,))
+    return [phrase + tail for phrase in hundred_phrases]
+
+
+class PhraseTable:
+    """ parse_values of the common runs of the number words computed in advance, a run is converted by one dict lookup.
+        Runs are keyed by the tuple of their values, so all spellings of the number words ("üç", "uch") share the entries.
+
+        param: phrases -> tuples of the values of the runs
+    """
+    __slots__ = ('_parsed',)
+
+    def __init__(self, phrases):
+        self._parsed = {}
+        for values in phrases:
+            values = tuple(values)
+            if values not in self._parsed:
+                self._parsed[values] = parse_values(values)
+
+    def get(self, values:tuple):
+        """ parse_values of the run or None if the run is not in the table """
+        return self._parsed.get(values)
+
+    def __len__(self):
+        return len(self._parsed)
+
+    def __contains__(self, values) -> bool:
+        return values in self._parsed
+
+    def items(self):
+        return self._parsed.items()
+
+    def memory_report(self) -> dict:
+        """ Number of the entries and the bytes taken by the dictionary, its keys and values.
+            Small integers are shared by the interpreter, so they are not counted
+        """
+        keys = sum(sys.getsizeof(values) for values in self._parsed)
+        parsed = sum(sys.getsizeof(numbers) for numbers in self._parsed.values())
+        table = sys.getsizeof(self._parsed)
+        return {'entries': len(self._parsed), 'dict_bytes': table, 'key_bytes': keys, 'value_bytes': parsed,
+                'total_bytes': table + keys + parsed}
+
+
+def date_phrases(years=range(1900, 2101), days=range(1, 32)) -> list:
+    """ Values of the runs of the number words common in the dates: numbers below 100 (days and two-digit years),
+        full years and the years followed by the day without any separator ("min doqquz yüz doxsan beş on iki")
+    """
+    phrases = [phrase for number in range(100) for phrase in value_phrases(number)]
+    year_phrases = [phrase for year in years for phrase in value_phrases(year)]
+    day_phrases = [phrase for day in days for phrase in value_phrases(day)]
+    phrases += year_phrases
+    phrases += [year + day for year in year_phrases for day in day_phrases]
+    return phrases
@@ -0,0 +1,66 @@
+""" Fast parser of the dates written only with digits and separators, such that "1992.06.25", "25/06/1992", "19920625".
+
+    It recognizes the numerical formats of extract_date_dateparser without calling dateparser:
+        year first:  1992.06.25, 1992/06/25, 1992-06-25, 1992.06/25, 1992-06/15, 199206/15, 199206-15
+        year last:   25.06.1992, 25/06/1992, 06-25-1992, 25.06.92, 25/06/92, 06-25-92
+        compact:     19920625, 920625
+"""
+import datetime
+import re
+
+# year first with any separators, or year and month without separator
+_YEAR_FIRST = re.compile(r'(\d{4})[./-]?(\d{1,2})[./-](\d{1,2})')
+# day and month first, the same separator twice
+_YEAR_LAST = re.compile(r'(\d{1,2})([./-])(\d{1,2})\2(\d{4}|\d{2})')
+# only digits, YYYYMMDD or YYMMDD
+_COMPACT = re.compile(r'(\d{4}|\d{2})(\d{2})(\d{2})')
+
+# (separator, length of the year) of the year last dates where the day is tried first, the order of the formats in extract_date_dateparser:
+# %d.%m.%Y before %m.%d.%Y, %d/%m/%Y before %m/%d/%Y, %d.%m.%y before %m.%d.%y, but %m/%d/%y before %d/%m/%y and only %m-%d-%Y, %m-%d-%y
+DAY_FIRST_FORMATS = frozenset([('.', 4), ('/', 4), ('.', 2)])
+
+
+def parse_numeric_date(text:str, day_first:bool = None):
+    """ Parses the numerical date and checks that it exists in the calendar.
+
+        param: text -> date without spaces, example "25.06.1992"
+        param: day_first -> order of the day and the month when the year is the last field:
+                            True is day.month.year, False is month.day.year,
+                            None tries the order of the formats in extract_date_dateparser first (see DAY_FIRST_FORMATS)
+                            and then the other order
+
+        return: date in ISO format (YYYY-MM-DD) or None if the text is not one of the supported formats
+    """
+    match = _YEAR_FIRST.fullmatch(text)
+    if match:
+        return _iso(match.group(1), match.group(2), match.group(3))
+
+    match = _COMPACT.fullmatch(text)
+    if match:
+        return _iso(match.group(1), match.group(2), match.group(3))
+
+    match = _YEAR_LAST.fullmatch(text)
+    if match:
+        first, separator, second, year = match.groups()
+        if day_first is None:
+            orders = [True, False] if (separator, len(year)) in DAY_FIRST_FORMATS else [False, True]
+        else:
+            orders = [day_first]
+        for order in orders:
+            day, month = (first, second) if order else (second, first)
+            iso = _iso(year, month, day)
+            if iso is not None:
+                return iso
+
+    return None
+
+
+def _iso(year:str, month:str, day:str):
+    """ ISO date of the fields or None if the date does not exist. Two digit years are read as strptime does (69-99 -> 1900s) """
+    year_number = int(year)
+    if len(year) == 2:
+        year_number += 1900 if year_number >= 69 else 2000
+    try:
+        return datetime.date(year_number, int(month), int(day)).isoformat()
+    except ValueError:
+        return None
@@ -0,0 +1,98 @@
+""" Converts dates on many processes.
+
+    Input texts are split into chunks, every chunk is converted with convert_batch on one of the worker processes
+    and the results are yielded in the order of the input texts.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Number of the texts sent to a worker at once, large enough to make the cost of sending them negligible
+CHUNK_SIZE = 1000
+
+# Number of the chunks waiting in the pool for every worker, limits the memory used by the not yet yielded results
+CHUNKS_PER_WORKER = 2
+
+
+# Persistent result cache of the worker process, opened by _init_worker
+_worker_cache = None
+
+
+def _init_worker(cache_path:str = None, fallback = None):
+    """ Builds the lexicon and the matchers once for every worker process, before its first chunk
+
+        param: cache_path -> path of the persistent result cache file, see convert_extract.open_result_cache
+        param: fallback -> backend of the date fallback of the parent process (see worker_fallback), DATE_TRANSLATION_FALLBACK if None
+    """
+    global _worker_cache
+
+    # number and month matchers are built on import of convert_extract
+    import convert_extract
+    from date_fallback import set_fallback
+    from stem_app import get_stemmer
+
+    # before the result cache, its lexicon_version depends on the backend
+    if fallback is not None:
+        set_fallback(fallback)
+
+    # shared stemmer loads words.txt and suffix.txt
+    get_stemmer()
+    # phrase table renders and parses every date phrase, it is built on the first run of the number words otherwise
+    convert_extract.get_phrase_table()
+
+    if cache_path is not None:
+        _worker_cache = convert_extract.open_result_cache(cache_path)
+
+
+def worker_fallback():
+    """ Current backend of the date fallback as it is passed to _init_worker: the name of the built-in backends
+        (see date_fallback.FALLBACKS) and the backend object itself for the others, it must be picklable
+    """
+    from date_fallback import FALLBACKS, get_fallback
+    fallback = get_fallback()
+    return fallback.name if isinstance(fallback, FALLBACKS.get(fallback.name, ())) else fallback
+
+
+def _convert_chunk(texts:list) -> list:
+    from convert_extract import convert_batch
+    return convert_batch(texts, cache=_worker_cache)
+
+
+def _chunks(texts, chunk_size:int):
+    texts = iter(texts)
+    while True:
+        chunk = list(islice(texts, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def convert_parallel(texts, workers:int = None, chunk_size:int = CHUNK_SIZE, cache_path:str = None):
+    """ Converts texts like convert_batch does, but on several processes.
+
+        param: texts -> iterable of the input texts, it is read lazily
+        param: workers -> number of the worker processes, number of CPUs by default
+        param: chunk_size -> number of the texts converted by a worker at once
+        param: cache_path -> path of the persistent result cache file shared by the workers, see convert_extract.open_result_cache
+
+        Workers use the date fallback backend of this process, see date_fallback.set_fallback
+
+        return: generator of the result dictionaries in the order of the input texts
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunk_size < 1:
+        raise ValueError('workers and chunk_size must be positive')
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_path, worker_fallback())) as pool:
+        # futures of the submitted chunks in the input order
+        pending = deque()
+        for chunk in _chunks(texts, chunk_size):
+            pending.append(pool.submit(_convert_chunk, chunk))
+            # do not read the whole input ahead, wait for the oldest chunk when enough work is queued
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
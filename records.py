@@ -0,0 +1,84 @@
+""" Compact records passed through the conversion pipeline.
+
+    Token is one element of the input text from split_tokens through to_convert and extract_entities.
+    DateResult is the result of one text, convert_batch returns it as dictionary.
+"""
+import re
+
+# Kinds of the token values
+NUMERIC = 'numeric'
+WORD = 'word'
+PUNCTUATION = 'punctuation'
+
+# Fields of DateResult in the order of the result dictionaries
+RESULT_FIELDS = ('input', 'converted', 'year', 'month', 'day', 'iso', 'method')
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def token_kind(value:str) -> str:
+    """ NUMERIC for digits ("1992"), WORD for words ("aprel", "ci") and PUNCTUATION for the rest (",", ".").
+        Only decimal digits are NUMERIC, what int() accepts, "½" and "²" are not numbers
+    """
+    if value.isdecimal():
+        return NUMERIC
+    if _WORD_CHAR.match(value):
+        return WORD
+    return PUNCTUATION
+
+
+class Token:
+    """ One element of the input text during the conversion.
+
+        param: value -> text of the element, such that "aprel", "ci" or "1992" after the numbers are converted
+        param: is_text_number -> True if the value is converted from the number written with words ("iki min" -> "2000")
+        param: span -> (start, end) of the source word in the lower cased input text, None if it is unknown.
+                       Root and suffix of one word have the same span, converted numbers span all their words
+    """
+    __slots__ = ('value', 'kind', 'is_text_number', 'span')
+
+    def __init__(self, value:str, is_text_number:bool = False, span:tuple = None):
+        self.value = value
+        self.kind = token_kind(value)
+        self.is_text_number = is_text_number
+        self.span = span
+
+    def __eq__(self, other):
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (self.value, self.is_text_number, self.span) == (other.value, other.is_text_number, other.span)
+
+    def __repr__(self):
+        return f'Token({self.value!r}, is_text_number={self.is_text_number}, span={self.span})'
+
+
+def join_values(tokens:list) -> str:
+    """ Values of the tokens joined with spaces, "converted" of the result. Such that [Token("1995"), Token("dekabr")] -> "1995 dekabr" """
+    return ' '.join([token.value for token in tokens])
+
+
+class DateResult:
+    """ Result of the conversion of one text, to_dict() gives the dictionary returned by convert_batch """
+    __slots__ = RESULT_FIELDS
+
+    def __init__(self, input:str, converted:str = '', year:int = None, month:int = None, day:int = None,
+                 iso:str = None, method:str = None):
+        self.input = input
+        self.converted = converted
+        self.year = year
+        self.month = month
+        self.day = day
+        self.iso = iso
+        self.method = method
+
+    def set_iso(self, iso):
+        """ Sets iso and the year, month and day from the ISO date (YYYY-MM-DD) """
+        self.iso = iso
+        if iso is not None:
+            self.year, self.month, self.day = map(int, iso.split('-'))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in RESULT_FIELDS}
+
+    def __repr__(self):
+        return 'DateResult(%s)' % ', '.join(f'{name}={getattr(self, name)!r}' for name in RESULT_FIELDS)
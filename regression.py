@@ -0,0 +1,245 @@
+""" Accuracy and throughput regression check of the conversion on a golden corpus.
+
+    python regression.py record golden.json     # records the outputs, accuracy and throughput of the current implementation
+    python regression.py check golden.json      # exits with 1 if the outputs changed, the accuracy dropped or the throughput regressed
+
+    Golden corpus is test_texts of convert_extract, verb.txt forms (they are not dates) and every date in between
+    1900-01-01 and 2100-12-31 written with words in one of DATE_STYLES, with inflected months and ordinal years,
+    and a seeded typo in one of the number words of every TYPO_EVERY-th date.
+    Every text is run through split_input, to_convert and extract_entities, and through convert_batch end to end.
+    Dates that need the fallback parser are parsed by the backend of date_fallback, dateparser is slow,
+    "record --fallback strptime" records a faster golden run; check always uses the backend of the golden results.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import platform
+import random
+import sys
+import time
+
+import convert_extract
+from benchmark import clear_caches, load_verb_forms, make_typo
+from date_fallback import get_fallback, set_fallback
+from fuzzy_match import month_forms
+from numerals import number_to_words, ordinal_to_words
+
+# Ways to write a date, {month_form} is the month name or one of its inflected forms (month_forms)
+DATE_STYLES = [
+    '{day} {month} {year}',
+    '{year} {month} {day}',
+    '{year} {day} {month}',
+    '{year_ordinal} ilin {day} {month_form}',
+    '{day} {month_form} {year}',
+]
+
+# Every TYPO_EVERY-th generated date gets a typo in one of its number words
+TYPO_EVERY = 10
+
+# Stages timed on the corpus, end_to_end is convert_batch of the whole corpus
+STAGES = ['split_input', 'to_convert', 'extract_entities', 'end_to_end']
+
+# Largest allowed drop of the accuracy of every group and of the throughput of every stage, as fractions
+ACCURACY_TOLERANCE = 0.0
+THROUGHPUT_TOLERANCE = 0.2
+
+# Number of the changed outputs printed by the check
+SHOWN_CHANGES = 10
+
+
+def render_date(date:datetime.date, rng:random.Random) -> str:
+    """ Date written with words in a random one of DATE_STYLES, such that "min doqquz yüz doxsan beşinci ilin on iki dekabrın" """
+    month = convert_extract.MONTHS[date.month - 1]
+    # inflected forms in the azerbaijani spelling, the latin spellings follow them
+    forms = month_forms(month)
+    return rng.choice(DATE_STYLES).format(day=number_to_words(date.day), month=month, year=number_to_words(date.year),
+                                          year_ordinal=ordinal_to_words(date.year),
+                                          month_form=rng.choice([month] + forms[:len(forms) // 2]))
+
+
+def build_golden_corpus(seed:int = 0, start:int = 1900, end:int = 2100) -> list:
+    """ Cases of the golden corpus as (group, text, expected ISO date) tuples, same seed gives the same corpus.
+        Groups are "test_texts" (no expected date), "verbs" (expected None), "dates" and "typos" (dates with one typo)
+    """
+    rng = random.Random(seed)
+    cases = [('test_texts', text, None) for text in convert_extract.test_texts]
+    cases += [('verbs', word, None) for word in dict.fromkeys(load_verb_forms())]
+
+    month_names = set(convert_extract.MONTHS)
+    date = datetime.date(start, 1, 1)
+    last = datetime.date(end, 12, 31)
+    index = 0
+    while date <= last:
+        text = render_date(date, rng)
+        group = 'dates'
+        if index % TYPO_EVERY == TYPO_EVERY - 1:
+            words = text.split(' ')
+            positions = [i for i, word in enumerate(words) if word != 'ilin' and word not in month_names and not word.startswith(tuple(month_names))]
+            position = rng.choice(positions)
+            words[position] = make_typo(words[position], rng)
+            text = ' '.join(words)
+            group = 'typos'
+        cases.append((group, text, date.isoformat()))
+        date += datetime.timedelta(days=1)
+        index += 1
+    return cases
+
+
+def corpus_hash(cases:list) -> str:
+    """ Hash of the corpus, golden outputs can be compared only on the same corpus """
+    return hashlib.sha1(json.dumps(cases, ensure_ascii=False).encode('utf8')).hexdigest()
+
+
+def run_corpus(cases:list, rounds:int = 3) -> dict:
+    """ Runs the stages on the texts of the cases, every round starts with empty caches
+
+        return: {"outputs": list of the outputs of every case, "throughput": {stage: texts per second of the fastest round}}
+                output is [converted, entities, iso, method] where converted is the joined to_convert output
+    """
+    texts = [text for _, text, _ in cases]
+    best = dict.fromkeys(STAGES, float('inf'))
+    for _ in range(rounds):
+        clear_caches()
+        seconds = dict.fromkeys(STAGES, 0.0)
+        outputs = []
+        for text in texts:
+            start = time.perf_counter()
+            splitted = convert_extract.split_input(text, convert_extract.suffix_shorten_dict)
+            split_end = time.perf_counter()
+            converted = convert_extract.to_convert(splitted)
+            convert_end = time.perf_counter()
+            entities = convert_extract.extract_entities(converted)
+            seconds['split_input'] += split_end - start
+            seconds['to_convert'] += convert_end - split_end
+            seconds['extract_entities'] += time.perf_counter() - convert_end
+            outputs.append([convert_extract.join_values(converted), entities])
+
+        clear_caches()
+        start = time.perf_counter()
+        results = convert_extract.convert_batch(texts)
+        seconds['end_to_end'] = time.perf_counter() - start
+        for output, result in zip(outputs, results):
+            output += [result['iso'], result['method']]
+
+        for stage in STAGES:
+            best[stage] = min(best[stage], seconds[stage])
+
+    return {'outputs': outputs, 'throughput': {stage: len(texts) / best[stage] for stage in STAGES}}
+
+
+def accuracy(cases:list, outputs:list) -> dict:
+    """ Fraction of the cases of every group with the expected ISO date, test_texts have no expected date """
+    correct = {}
+    total = {}
+    for (group, _, expected), output in zip(cases, outputs):
+        if group == 'test_texts':
+            continue
+        total[group] = total.get(group, 0) + 1
+        correct[group] = correct.get(group, 0) + (output[2] == expected)
+    return {group: correct[group] / total[group] for group in total}
+
+
+def record(seed:int = 0, rounds:int = 3, fallback:str = None) -> dict:
+    """ Golden results of the current implementation
+
+        param: fallback -> name of the fallback backend (date_fallback.FALLBACKS), the current backend by default
+    """
+    if fallback is not None:
+        set_fallback(fallback)
+    cases = build_golden_corpus(seed)
+    run = run_corpus(cases, rounds)
+    meta = {'seed': seed, 'rounds': rounds, 'cases': len(cases), 'corpus': corpus_hash(cases),
+            'fallback': get_fallback().name, 'lexicon': convert_extract.lexicon_version(), 'python': platform.python_version(),
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    return {'meta': meta, 'accuracy': accuracy(cases, run['outputs']), 'throughput': run['throughput'], 'outputs': run['outputs']}
+
+
+def check(golden:dict, rounds:int = 3, accuracy_tolerance:float = ACCURACY_TOLERANCE,
+          throughput_tolerance:float = THROUGHPUT_TOLERANCE, allow_changes:bool = False) -> tuple:
+    """ Runs the corpus of the golden results again and compares the results with them
+
+        param: accuracy_tolerance -> largest allowed drop of the accuracy of every group, 0.01 is one percentage point
+        param: throughput_tolerance -> largest allowed drop of the throughput of every stage, 0.2 is 20% slower
+        param: allow_changes -> changed outputs are reported but do not fail the check
+
+        return: (current results as record returns them, list of the failures, list of (text, golden output, current output) of the changes)
+    """
+    set_fallback(golden['meta']['fallback'])
+    cases = build_golden_corpus(golden['meta']['seed'])
+    if corpus_hash(cases) != golden['meta']['corpus']:
+        raise ValueError('golden results were recorded on another corpus, record them again')
+
+    run = run_corpus(cases, rounds)
+    current = {'meta': dict(golden['meta'], rounds=rounds, time=time.strftime('%Y-%m-%dT%H:%M:%S')),
+               'accuracy': accuracy(cases, run['outputs']), 'throughput': run['throughput'], 'outputs': run['outputs']}
+
+    failures = []
+    for group, golden_accuracy in golden['accuracy'].items():
+        if current['accuracy'][group] < golden_accuracy - accuracy_tolerance:
+            failures.append(f'accuracy of {group} dropped from {golden_accuracy:.4f} to {current["accuracy"][group]:.4f}')
+    for stage, golden_throughput in golden['throughput'].items():
+        if current['throughput'][stage] < golden_throughput * (1 - throughput_tolerance):
+            failures.append(f'throughput of {stage} dropped from {golden_throughput:.0f} to {current["throughput"][stage]:.0f} texts/s')
+
+    changes = [(text, golden_output, output) for (_, text, _), golden_output, output in zip(cases, golden['outputs'], run['outputs'])
+               if golden_output != output]
+    if changes and not allow_changes:
+        failures.append(f'{len(changes)} of {len(cases)} outputs changed')
+    return current, failures, changes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Accuracy and throughput regression check of the conversion on a golden corpus.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help='record the golden results of the current implementation')
+    record_parser.add_argument('golden', help='JSON file of the golden results')
+    record_parser.add_argument('--seed', type=int, default=0)
+    record_parser.add_argument('--rounds', type=int, default=3, help='number of the passes over the corpus, the fastest one is kept (default: 3)')
+    record_parser.add_argument('--fallback', help='fallback backend of the numerical dates, see date_fallback (default: the current one)')
+
+    check_parser = commands.add_parser('check', help='compare the current implementation with the golden results')
+    check_parser.add_argument('golden', help='JSON file of the golden results')
+    check_parser.add_argument('--rounds', type=int, default=3, help='number of the passes over the corpus, the fastest one is kept (default: 3)')
+    check_parser.add_argument('--accuracy-tolerance', type=float, default=ACCURACY_TOLERANCE,
+                              help=f'largest allowed drop of the accuracy of every group (default: {ACCURACY_TOLERANCE})')
+    check_parser.add_argument('--throughput-tolerance', type=float, default=THROUGHPUT_TOLERANCE,
+                              help=f'largest allowed drop of the throughput of every stage as fraction (default: {THROUGHPUT_TOLERANCE})')
+    check_parser.add_argument('--allow-changes', action='store_true', help='report the changed outputs without failing')
+    check_parser.add_argument('--output', help='save the current results to this JSON file')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        results = record(args.seed, args.rounds, args.fallback)
+        with open(args.golden, 'w', encoding='utf-8') as golden_file:
+            json.dump(results, golden_file, ensure_ascii=False)
+        golden = None
+    else:
+        with open(args.golden, 'r', encoding='utf-8') as golden_file:
+            golden = json.load(golden_file)
+        results, failures, changes = check(golden, args.rounds, args.accuracy_tolerance, args.throughput_tolerance, args.allow_changes)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output_file:
+                json.dump(results, output_file, ensure_ascii=False)
+
+    print(f'{"group":<12} {"accuracy":>9}' + (f' {"golden":>9}' if golden else ''))
+    for group, value in results['accuracy'].items():
+        print(f'{group:<12} {value:>9.4f}' + (f' {golden["accuracy"][group]:>9.4f}' if golden else ''))
+    print(f'{"stage":<18} {"texts/s":>9}' + (f' {"golden":>9} {"ratio":>6}' if golden else ''))
+    for stage, value in results['throughput'].items():
+        golden_value = golden['throughput'][stage] if golden else None
+        print(f'{stage:<18} {value:>9.0f}' + (f' {golden_value:>9.0f} {value / golden_value:>6.2f}' if golden else ''))
+
+    if golden is None:
+        return 0
+    for text, golden_output, output in changes[:SHOWN_CHANGES]:
+        print(f'changed: {text!r}: {golden_output} -> {output}')
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
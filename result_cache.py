@@ -0,0 +1,80 @@
+""" Persistent cache of the conversion results in SQLite file.
+
+    Results are stored with the version of the lexicon (convert_extract.lexicon_version: the version of the code, words.txt,
+    suffix.txt, numbers, MONTHS, suffix_shorten_dict and the fallback backend).
+    When the cache file is opened with another version, all stored results are deleted.
+"""
+import json
+import sqlite3
+
+# Number of the keys looked up with one SQL query, lower than the SQLite limit of the query parameters
+LOOKUP_BATCH_SIZE = 500
+
+
+def normalize_text(text:str) -> str:
+    """ Key of the input text in the cache. Texts that differ only in case or spaces have the same conversion, such that
+        " Min  doqquz yuz " -> "min doqquz yuz"
+    """
+    return ' '.join(text.lower().split())
+
+
+class ResultCache:
+    """ Key-value store of the conversion results in SQLite file, can be shared by several processes.
+
+        param: path -> path of the SQLite file, it is created if it does not exist
+        param: version -> version of the lexicon, results of the other versions are deleted on open
+    """
+
+    def __init__(self, path:str, version:str):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+        # timeout makes concurrent writers wait for each other instead of failing
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT)')
+            row = self._connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is None or row[0] != version:
+                self._connection.execute('DELETE FROM results')
+                self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def get_many(self, keys) -> dict:
+        """ Returns dictionary of the found keys and their stored results """
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            part = keys[start:start + LOOKUP_BATCH_SIZE]
+            query = 'SELECT key, value FROM results WHERE key IN (%s)' % ','.join('?' * len(part))
+            for key, value in self._connection.execute(query, part):
+                found[key] = json.loads(value)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items:dict):
+        """ Stores dictionary of the keys and their results, results must be JSON serializable """
+        if not items:
+            return
+        with self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?)',
+                                         ((key, json.dumps(value, ensure_ascii=False)) for key, value in items.items()))
+
+    def clear(self):
+        with self._connection:
+            self._connection.execute('DELETE FROM results')
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
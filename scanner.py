@@ -0,0 +1,206 @@
+""" Finds dates inside long texts such as contracts and call transcripts.
+
+    The text is tokenized once. Number words, month names and digits are cheap anchors: they are recognized by
+    set lookups of the word and its prefixes, without stemming. Anchors close to each other form a candidate window,
+    and only the windows that can hold a date (a month, three numbers or a compact numerical date) are converted
+    by the full pipeline (split_tokens, to_convert, extract_entities). So the time is linear in the length of the text.
+
+        for match in iter_dates(document):
+            print(match.start, match.end, match.result.iso)
+
+    or from the command line, one JSON line per found date:
+        python scanner.py contract.txt
+"""
+import argparse
+import json
+import re
+import sys
+from functools import lru_cache
+
+from convert_extract import (MONTHS, TOKEN_PATTERN, convert_splitted, numbers, resolve_pending_dateparser,
+                             split_tokens, suffix_shorten_dict)
+
+# Kinds of the anchor tokens
+NUMBER_WORD = 'number_word'
+MONTH = 'month'
+DIGITS = 'digits'
+
+# Non-anchor tokens allowed in between two anchors of one window, such that "ilin" in "iki min ikinci ilin on beş aprel"
+MAX_GAP = 1
+
+# Largest number of the tokens in one window, longer runs of the anchors (tables of numbers) are split
+MAX_WINDOW_TOKENS = 12
+
+# Shortest prefix of the word checked against the number words and the months
+_MIN_PREFIX = 2
+_NUMBER_WORDS = frozenset(numbers)
+_MONTH_NAMES = frozenset(MONTHS)
+_LONGEST_PREFIX = max(len(word) for word in _NUMBER_WORDS | _MONTH_NAMES)
+
+# Numerical date written with digits only: one number or numbers joined with separators, such that "25.06.1992" or "19920625".
+# Numbers separated only by spaces are tables or lists, not dates
+_NUMERICAL_DATE = re.compile(r'\d+(?:\s*[./-]\s*\d+)*')
+
+
+class DateMatch:
+    """ Date found in the text.
+
+        param: start, end -> character span of the date in the scanned text, text[start:end] is the converted window
+        param: result -> records.DateResult of the window, result.input is text[start:end]
+    """
+    __slots__ = ('start', 'end', 'result')
+
+    def __init__(self, start:int, end:int, result):
+        self.start = start
+        self.end = end
+        self.result = result
+
+    def to_dict(self) -> dict:
+        """ Result dictionary of convert_batch with the start and the end of the date in the text """
+        return {'start': self.start, 'end': self.end, **self.result.to_dict()}
+
+    def __repr__(self):
+        return f'DateMatch({self.start}, {self.end}, {self.result!r})'
+
+
+def normalize_case(text:str) -> str:
+    """ Lower cased text with the same length, "İ" is lowered to "i" instead of "i" with combining dot,
+        so the spans of the normalized text are the spans of the original one
+    """
+    return text.replace('İ', 'i').lower()
+
+
+@lru_cache(maxsize=65536)
+def anchor_kind(word:str):
+    """ Kind of the anchor of the normalized word or None. Word is a month or a number word if it starts with one,
+        such that "aprelin" -> MONTH, "ikinci" -> NUMBER_WORD, "1992" -> DIGITS, "müqavilə" -> None
+    """
+    if word.isdecimal():
+        return DIGITS
+    for length in range(min(len(word), _LONGEST_PREFIX), _MIN_PREFIX - 1, -1):
+        prefix = word[:length]
+        if prefix in _MONTH_NAMES:
+            return MONTH
+        if prefix in _NUMBER_WORDS:
+            return NUMBER_WORD
+    return None
+
+
+def _is_candidate(anchors:list) -> bool:
+    """ Whether the anchors can hold a date: a month, three numbers or a compact numerical date like "19920625", "920625" or "199206/15" """
+    if len(anchors) >= 3:
+        return True
+    return any(kind == MONTH or kind == DIGITS and len(word) in (6, 8) for start, kind, word in anchors)
+
+
+def iter_windows(text:str, max_gap:int = MAX_GAP, max_tokens:int = MAX_WINDOW_TOKENS):
+    """ Yields the candidate windows of the text in one pass over its tokens.
+        Window is a tuple of its anchors, list of (start, kind, word), and the end of its last anchor
+    """
+    anchors = []
+    end = 0
+    # tokens of the current window and the non-anchor tokens after its last anchor
+    tokens = 0
+    gap = 0
+
+    for match in TOKEN_PATTERN.finditer(text):
+        word = normalize_case(match.group())
+        kind = anchor_kind(word)
+
+        if kind is None:
+            if anchors:
+                gap += 1
+                if gap > max_gap:
+                    if _is_candidate(anchors):
+                        yield anchors, end
+                    anchors, tokens, gap = [], 0, 0
+            continue
+
+        if anchors and tokens + gap >= max_tokens:
+            if _is_candidate(anchors):
+                yield anchors, end
+            anchors, tokens, gap = [], 0, 0
+        anchors.append((match.start(), kind, word))
+        end = match.end()
+        tokens += gap + 1
+        gap = 0
+
+    if anchors and _is_candidate(anchors):
+        yield anchors, end
+
+
+def iter_dates(text:str, day_first:bool = None, use_dateparser:bool = False, complete_only:bool = True,
+               max_gap:int = MAX_GAP, max_tokens:int = MAX_WINDOW_TOKENS):
+    """ Yields DateMatch of every date found in the text, in the order of the text.
+        If the whole window is not a date, it is converted again from its next anchors while they can hold a date,
+        so that a word like "onun" (genitive of "on") before the date does not spoil it.
+
+        param: text -> text of any length
+        param: day_first -> order of the day and the month in numerical dates, see parse_numeric_date
+        param: use_dateparser -> numerical windows that parse_numeric_date can not parse are given to dateparser.
+                                 It is slow, so such windows are skipped by default
+        param: complete_only -> only dates with year, month and day (result.iso is not None) are yielded,
+                                otherwise windows with any extracted part are yielded as well
+        param: max_gap -> non-anchor tokens allowed in between two anchors of one window
+        param: max_tokens -> largest number of the tokens in one window
+    """
+    for anchors, end in iter_windows(text, max_gap, max_tokens):
+        found = partial = None
+        for position, (start, kind, word) in enumerate(anchors):
+            if position and not _is_candidate(anchors[position:]):
+                break
+            if all(kind == DIGITS for _, kind, _ in anchors[position:]) and not _NUMERICAL_DATE.fullmatch(text, start, end):
+                continue
+            result = _convert_window(text[start:end], day_first, use_dateparser)
+            if result is None:
+                continue
+            if result.iso is not None:
+                found = DateMatch(start, end, result)
+                break
+            if partial is None and (result.year or result.month or result.day):
+                partial = DateMatch(start, end, result)
+
+        if found is None and not complete_only:
+            found = partial
+        if found is not None:
+            yield found
+
+
+def _convert_window(window_text:str, day_first:bool, use_dateparser:bool):
+    """ DateResult of the window, None if it needs dateparser and use_dateparser is False """
+    pending_dateparser = {}
+    splitted = split_tokens(normalize_case(window_text), suffix_shorten_dict)
+    result = convert_splitted(window_text, splitted, day_first, pending_dateparser)
+    if pending_dateparser:
+        if not use_dateparser:
+            return None
+        resolve_pending_dateparser(pending_dateparser)
+    return result
+
+
+def scan_dates(text:str, **options) -> list:
+    """ List of the DateMatch found in the text, see iter_dates for the options """
+    return list(iter_dates(text, **options))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find dates written with words or digits inside long texts.')
+    parser.add_argument('input', nargs='?', default='-', help='text file (default: standard input)')
+    parser.add_argument('--day-first', action='store_true', default=None, help='read "05.06.1992" as 5 June')
+    parser.add_argument('--month-first', dest='day_first', action='store_false', help='read "05.06.1992" as May 6')
+    parser.add_argument('--dateparser', action='store_true', help='parse the other numerical dates with dateparser (slow)')
+    parser.add_argument('--partial', action='store_true', help='output the dates without year, month or day as well')
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.input, encoding='utf8') as input_file:
+            text = input_file.read()
+
+    for match in iter_dates(text, args.day_first, args.dateparser, not args.partial):
+        sys.stdout.write(json.dumps(match.to_dict(), ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
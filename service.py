@@ -0,0 +1,338 @@
+""" Asyncio service of the date conversion.
+
+    MicroBatcher collects the texts of concurrent callers for a few milliseconds and converts them together
+    with convert_batch on an executor, so the event loop is never blocked by the conversion.
+
+    It can be used inside an async application:
+        batcher = MicroBatcher()
+        await batcher.start()
+        result = await batcher.convert("min doqquz yuz doxsan besh on iki dekabr")
+
+    or run as a small HTTP/JSON server:
+        python service.py --port 8080 --processes 4
+        curl -d '{"text": "doxsan besh on uch avqust"}' localhost:8080/convert
+        curl -d '{"texts": ["1992.06.25", "iki min on mart"]}' localhost:8080/convert
+        curl localhost:8080/metrics     # Prometheus metrics, the stages are measured with --metrics
+"""
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
+from convert_extract import convert_batch
+from date_fallback import FALLBACKS, set_fallback
+
+logger = logging.getLogger(__name__)
+
+# Largest number of the texts converted in one batch
+MAX_BATCH_SIZE = 256
+
+# Seconds the first text of a batch waits for the other texts
+MAX_DELAY = 0.005
+
+# Largest number of the texts waiting for conversion, new texts are rejected when it is reached
+MAX_QUEUE_SIZE = 10000
+
+# Largest size of the HTTP request body in bytes
+MAX_BODY_SIZE = 1 << 20
+
+
+class ServiceOverloaded(Exception):
+    """ Raised when the queue of the waiting texts is full """
+
+
+class MicroBatcher:
+    """ Converts texts of concurrent callers in micro-batches.
+
+        param: executor -> executor that runs convert_batch, one thread by default.
+                           With ProcessPoolExecutor the batches are converted on several processes at the same time.
+        param: max_batch_size -> largest number of the texts in one batch
+        param: max_delay -> seconds the first text of a batch waits for the other texts
+        param: max_queue_size -> largest number of the waiting texts, convert raises ServiceOverloaded when it is reached
+        param: max_concurrent_batches -> number of the batches converted at the same time, should match the executor workers
+    """
+
+    def __init__(self, executor=None, max_batch_size:int = MAX_BATCH_SIZE, max_delay:float = MAX_DELAY,
+                 max_queue_size:int = MAX_QUEUE_SIZE, max_concurrent_batches:int = 1):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max_concurrent_batches
+        self._queue = None
+        self._task = None
+        self._batches = set()
+
+    async def start(self):
+        """ Starts collecting the batches, must be called inside the running event loop """
+        if self._task is not None:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='convert')
+        self._queue = asyncio.Queue(self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._task = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """ Stops collecting, waits for the batches that are being converted and fails the texts still in the queue """
+        if self._task is None:
+            return
+        while not self._task.done():
+            # wait_for of Python 3.11 swallows the cancellation if the queue returns a text at the same time, so it is repeated
+            self._task.cancel()
+            await asyncio.wait({self._task}, timeout=0.1)
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        while not self._queue.empty():
+            text, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(ServiceOverloaded('service is stopped'))
+
+    def pending(self) -> int:
+        """ Number of the texts waiting in the queue """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def convert(self, text:str) -> dict:
+        """ Converts one text, result is the same as convert_batch([text])[0]. Raises ServiceOverloaded if the queue is full """
+        if self._task is None:
+            raise RuntimeError('MicroBatcher is not started')
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((text, future))
+        except asyncio.QueueFull:
+            raise ServiceOverloaded(f'more than {self.max_queue_size} texts are waiting') from None
+        return await future
+
+    async def convert_many(self, texts:list) -> list:
+        """ Converts several texts, they can be spread over several batches.
+            Raises ServiceOverloaded before any of them is queued if the queue has no room for all of them
+        """
+        if self._task is None:
+            raise RuntimeError('MicroBatcher is not started')
+        free = self.max_queue_size - self._queue.qsize() if self.max_queue_size > 0 else len(texts)
+        if len(texts) > free:
+            raise ServiceOverloaded(f'{len(texts)} texts do not fit into the queue, {free} places are free')
+        # queued without awaiting in between, so other callers can not take the places checked above
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        for text, future in zip(texts, futures):
+            self._queue.put_nowait((text, future))
+        return list(await asyncio.gather(*futures))
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # wait for a free executor slot before taking texts, so that the texts wait in the bounded queue
+            await self._slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_delay
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # texts taken from the queue will never be converted
+                for text, future in batch:
+                    if not future.done():
+                        future.set_exception(ServiceOverloaded('service is stopped'))
+                raise
+            task = asyncio.create_task(self._convert_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _convert_batch(self, batch:list):
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                results = await loop.run_in_executor(self.executor, convert_batch, [text for text, future in batch])
+            except Exception:
+                if len(batch) == 1:
+                    raise
+                # texts are converted one by one, so only the callers of the failing texts get the error
+                logger.warning('conversion of %d texts failed, converting them one by one', len(batch))
+                for text, future in batch:
+                    try:
+                        result = (await loop.run_in_executor(self.executor, convert_batch, [text]))[0]
+                    except Exception as error:
+                        logger.exception('conversion of %r failed', text)
+                        if not future.done():
+                            future.set_exception(error)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
+            else:
+                for (text, future), result in zip(batch, results):
+                    # caller could be cancelled while waiting
+                    if not future.done():
+                        future.set_result(result)
+        except Exception as error:
+            logger.exception('conversion of %r failed', batch[0][0])
+            for text, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self._slots.release()
+
+
+async def _handle_connection(batcher:MicroBatcher, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+    """ Minimal HTTP/1.1 handler with keep-alive: POST /convert, GET /health and GET /metrics """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, path, version = request_line.decode('latin-1').split()
+            except ValueError:
+                await _respond(writer, 400, {'error': 'bad request line'}, keep_alive=False)
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            try:
+                length = int(headers.get('content-length', 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                await _respond(writer, 400, {'error': 'bad Content-Length'}, keep_alive=False)
+                break
+            if length > MAX_BODY_SIZE:
+                await _respond(writer, 413, {'error': 'request body is too large'}, keep_alive=False)
+                break
+            body = await reader.readexactly(length) if length else b''
+
+            status, payload, extra_headers = await _route(batcher, method, path, body)
+            await _respond(writer, status, payload, keep_alive, extra_headers)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    except Exception:
+        logger.exception('request failed')
+        try:
+            await _respond(writer, 500, {'error': 'internal server error'}, keep_alive=False)
+        except ConnectionError:
+            pass
+    finally:
+        writer.close()
+
+
+async def _route(batcher:MicroBatcher, method:str, path:str, body:bytes) -> tuple:
+    """ Returns (status, JSON payload or plain text, extra headers) of the request """
+    if path == '/health' and method == 'GET':
+        return 200, {'status': 'ok', 'pending': batcher.pending()}, {}
+    if path == '/metrics' and method == 'GET':
+        return 200, metrics.prometheus_text(), {}
+
+    if path != '/convert':
+        return 404, {'error': 'not found'}, {}
+    if method != 'POST':
+        return 405, {'error': 'use POST'}, {'Allow': 'POST'}
+
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return 400, {'error': 'body is not valid JSON'}, {}
+
+    try:
+        if isinstance(request, dict) and isinstance(request.get('text'), str):
+            return 200, await batcher.convert(request['text']), {}
+        if isinstance(request, dict) and isinstance(request.get('texts'), list) and all(isinstance(text, str) for text in request['texts']):
+            return 200, {'results': await batcher.convert_many(request['texts'])}, {}
+    except ServiceOverloaded as error:
+        return 503, {'error': str(error)}, {'Retry-After': '1'}
+    except Exception as error:
+        logger.exception('conversion failed')
+        return 500, {'error': f'conversion failed: {error!r}'}, {}
+
+    return 400, {'error': 'expected {"text": "..."} or {"texts": ["...", ...]}'}, {}
+
+
+async def _respond(writer:asyncio.StreamWriter, status:int, payload, keep_alive:bool, extra_headers:dict = None):
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+    if isinstance(payload, str):
+        # text format of the Prometheus metrics
+        body = payload.encode('utf8')
+        content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf8')
+        content_type = 'application/json; charset=utf-8'
+    headers = {'Content-Type': content_type, 'Content-Length': str(len(body)),
+               'Connection': 'keep-alive' if keep_alive else 'close', **(extra_headers or {})}
+    head = f'HTTP/1.1 {status} {reasons[status]}\r\n' + ''.join(f'{name}: {value}\r\n' for name, value in headers.items()) + '\r\n'
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+async def serve(host:str, port:int, batcher:MicroBatcher):
+    """ Runs the HTTP server until it is cancelled """
+    await batcher.start()
+    server = await asyncio.start_server(lambda reader, writer: _handle_connection(batcher, reader, writer), host, port)
+    logger.info('listening on %s', ', '.join(str(sock.getsockname()) for sock in server.sockets))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HTTP/JSON service of the date conversion with micro-batching.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--processes', type=int, default=0, help='convert on this many processes (default: 0, one thread of this process)')
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-delay-ms', type=float, default=MAX_DELAY * 1000)
+    parser.add_argument('--max-queue-size', type=int, default=MAX_QUEUE_SIZE)
+    parser.add_argument('--fallback', choices=sorted(FALLBACKS),
+                        help='parser of the numerical dates not in the common formats (default: dateparser), it is passed to the workers as well')
+    parser.add_argument('--metrics', action='store_true',
+                        help='measure the pipeline stages for /metrics, with --processes only the stages run by this process are measured')
+    args = parser.parse_args(argv)
+
+    if args.fallback is not None:
+        set_fallback(args.fallback)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s: %(message)s')
+    if args.metrics:
+        metrics.enable()
+
+    executor = None
+    concurrent_batches = 1
+    if args.processes > 0:
+        from parallel import _init_worker, worker_fallback
+        executor = ProcessPoolExecutor(max_workers=args.processes, initializer=_init_worker, initargs=(None, worker_fallback()))
+        concurrent_batches = args.processes
+
+    batcher = MicroBatcher(executor, args.max_batch_size, args.max_delay_ms / 1000, args.max_queue_size, concurrent_batches)
+    try:
+        asyncio.run(serve(args.host, args.port, batcher))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if batcher.executor is not None:
+            batcher.executor.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,28 @@
+import os
+from functools import lru_cache
 from stemmer import Stemmer
 from string import punctuation
 
+# Environment variable with the path of the compiled lexicon file (see compiled_lexicon.py) used instead of words.txt and suffix.txt
+LEXICON_ENV = "DATE_TRANSLATION_LEXICON"
+
+
+# Returns the Stemmer shared by all to_stem calls, it is created on the first call only
+@lru_cache(maxsize=None)
+def get_stemmer():
+    # Memory-mapped compiled lexicon is shared by all processes that use the same file
+    lexicon_path = os.environ.get(LEXICON_ENV)
+    if lexicon_path:
+        from compiled_lexicon import load_compiled_lexicon
+        return Stemmer(load_compiled_lexicon(lexicon_path))
+    return Stemmer()
+
+
 # Program starts here.
-def to_stem(text):
-    # Instantiate Stemmer object
-    my_stemmer = Stemmer()
+def to_stem(text, my_stemmer=None):
+    # Use the shared Stemmer object unless a custom one is given
+    if my_stemmer is None:
+        my_stemmer = get_stemmer()
     # Generate your text
     
     my_text = text
@@ -1,60 +1,101 @@
-# Stemmer class definition
+import hashlib
+import os
+from functools import lru_cache
+from suffix_trie import SuffixTrie
+
+# Directory of this module, the default words.txt and suffix.txt files are shipped next to it
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Default location of the words file
+WORDS_PATH = os.path.join(BASE_DIR, "words.txt")
+# Default location of the suffixes file
+SUFFIX_PATH = os.path.join(BASE_DIR, "suffix.txt")
+
+
+# Lexicon class definition, read-only container of the words and suffixes used by the Stemmer
+class Lexicon:
+    __slots__ = ("words", "suffixes", "suffix_trie", "version")
+
+    # Constructor of the Lexicon class
+    def __init__(self, words, suffixes):
+        # Words are stored in a frozenset so that the lookups are fast and nobody can change them
+        object.__setattr__(self, "words", frozenset(words))
+        # Suffixes are stored in a tuple, the order of the suffixes matters for the stemming
+        object.__setattr__(self, "suffixes", tuple(suffixes))
+        # Suffixes compiled into a trie, so that all suffixes of a word are found with one walk over the word
+        object.__setattr__(self, "suffix_trie", SuffixTrie(self.suffixes))
+        # Hash of the content, lexicons with the same words and suffixes have the same version
+        content = "\n".join(sorted(self.words)) + "\0" + "\n".join(self.suffixes)
+        object.__setattr__(self, "version", hashlib.sha1(content.encode("utf8")).hexdigest())
+
+    # Lexicon is shared between all stemming calls, so it can not be changed after creation
+    def __setattr__(self, name, value):
+        raise AttributeError("Lexicon is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Lexicon is immutable")
+
+    # Lexicons are equal if their versions are equal
+    def __eq__(self, other):
+        return isinstance(other, Lexicon) and self.version == other.version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    # Builds a lexicon from the given words and suffixes files
+    @classmethod
+    def from_files(cls, words_path=WORDS_PATH, suffix_path=SUFFIX_PATH):
+        return cls(_read_lines(words_path), _read_lines(suffix_path))
+
+
+# Reads the non-empty lines of the utf-8 encoded file
+def _read_lines(path):
+    # Open the file in read mode with utf-8 encoding.
+    with open(path, "r", encoding="utf8") as file:
+        # Trim the spaces and newline characters from the string before adding to the list
+        return [line.strip() for line in file if line.strip()]
+
+
+# Returns the lexicon of the given files, every file pair is loaded from disk only once per process
+@lru_cache(maxsize=None)
+def load_lexicon(words_path=WORDS_PATH, suffix_path=SUFFIX_PATH):
+    return Lexicon.from_files(words_path, suffix_path)
+
+
+# Stemmer class definition. Stemmer keeps no state of the calls, one object can be shared by any number of threads:
+# the lexicon is immutable and stemming is done by the pure functions stem_candidates and longest_stem below
 class Stemmer:
-    # Stores the words loaded from the words.txt file
-    words = set()
-    # Stores the suffixes loaded from the suffix.txt file
-    suffixes = []
-    # Stores all possible stems of a word
-    stems = []
+    __slots__ = ("lexicon",)
 
     # Constructor of the Stemmer class
-    def __init__(self):
-        # Loads words from the words.txt file
-        self.__load_words()
-        # Loads suffixes from the suffix.txt file
-        self.__load_suffixes()
-
-    # Destructor of the Stemmer class
-    def __del__(self):
-        # Clear both lists to free the memory space
-        self.words.clear()
-        self.suffixes.clear()
-
-    # Loads the words from the word.txt file into memory
-    def __load_words(self):
-        # Open words.txt file in read mode with utf-8 encoding.
-        with open(r"C:\Users\ii.karimli\Desktop\test\stemmer\words.txt", "r", encoding="utf8") as words_file:
-            # Iterate over each line in the words.txt file
-            for word in words_file:
-                # Trim the spaces and newline characters from the string before adding to the list
-                self.words.add(word.strip())
-
-    # Loads the suffixes from the suffix.txt file into memory
-    def __load_suffixes(self):
-        # Open suffix.txt file in read mode with utf-8 encoding
-        with open(r"C:\Users\ii.karimli\Desktop\test\stemmer\suffix.txt", "r", encoding="utf8") as suffix_file:
-            # Iterate over each line in the suffix.txt file
-            for suffix in suffix_file:
-                # Trim the spaces and newline characters from the string before adding to the list
-                self.suffixes.append(suffix.strip())
+    def __init__(self, lexicon=None):
+        # Use the shared default lexicon (words.txt and suffix.txt next to this module) if no lexicon is given
+        self.lexicon = lexicon if lexicon is not None else load_lexicon()
+
+    # Words loaded from the words file
+    @property
+    def words(self):
+        return self.lexicon.words
+
+    # Suffixes loaded from the suffixes file
+    @property
+    def suffixes(self):
+        return self.lexicon.suffixes
 
     # Removes one suffix at a time
     def suffix(self, word):
-        for suffix in self.suffixes:
-            # If the word ends with the particular suffix, create a new word by removing that suffix
-            if word.endswith(suffix) and (word[:word.rfind(suffix)] in self.words):
-                word = word[:word.rfind(suffix)]
-                return word
-        # Iterate over the suffixes
-        for suffix in self.suffixes:
-            # If the word ends with the particular suffix, create a new word by removing that suffix
-            if word.endswith(suffix):
-                word = word[:word.rfind(suffix)]
-                return word
+        matches = self.lexicon.suffix_trie.matches(word)
+        for suffix, position in matches:
+            # If the word without the particular suffix is a known word, return it
+            if word[:position] in self.words:
+                return word[:position]
+        # Otherwise remove the first suffix the word ends with
+        for suffix, position in matches:
+            return word[:position]
         return word
 
     # Converts changed suffixes and roots to their original forms
-    def converter(self, word):
+    @staticmethod
+    def converter(word):
         if word.endswith('lığ') or word.endswith('luğ') or word.endswith('lağ') or word.endswith('cığ'):
             l=list(word); l[-1]='q'; return "".join(l)
         if word.endswith('liy') or word.endswith('lüy'):
@@ -73,42 +114,83 @@ class Stemmer:
             l=list(word); l[2]='t'; return "".join(l)
         return word
         
-    # Returns the stemmed version of word
+    # Returns all possible stems of the word, in the order they are found
+    def stem_candidates(self, word):
+        return stem_candidates(self.lexicon, word)
+
+    # Returns the stemmed version of word, which is the longest possible stem or the word itself
     def stem_word(self, word):
-        # Change the word to lowercase.
-        word = word.lower()
-        # Convert if the word has changed root or suffix
-        word = self.converter(word)
-        # If word is already in the list, append it to stems list
-        if word.isnumeric():
-                self.stems.append(word)
-        else: 
-            if word in self.words:
-                self.stems.append(word)
-        # Iterate through suffixes
-        for suffix in self.suffixes:
-                # If word ends with current suffix, remove the suffix and stem again
-                if word.endswith(suffix):
-                    self.stem_word(word[:word.rfind(suffix)])
-                
+        return longest_stem(self.lexicon, word)
+
     # Returns the stemmed versions of the given words
     def stem_words(self, list_of_words):
-        # Iterate over the range of word indexes
-        list_of_stems = []
-        for word in list_of_words:
-            # Empty the stems list for each word
-            self.stems = []
-            # Apply stemming to each word in the list.
-            self.stem_word(word)
-            selected_stem = ""
-            # Choose the stem with the maximum length
-            for stem in self.stems:
-                if len(stem) > len(selected_stem): selected_stem = stem
-            # If there is no selected stem for word, append the word itself
-            if selected_stem == "":
-                selected_stem = word
-            # Append the stem of the current word to the list of stems
-            list_of_stems.append(selected_stem)
-            
-        # Return the updated list.
-        return list_of_stems
+        # Apply stemming to each word in the list.
+        return [self.stem_word(word) for word in list_of_words]
+
+
+# Function called with the deepest recursion (number of the removed suffixes) of every stem_candidates search,
+# it is set by metrics.enable() and it is None otherwise
+depth_observer = None
+
+
+# Returns all possible stems of the word. Every distinct remainder of the word is stemmed only once,
+# so the search is linear in the number of remainders instead of exponential in the number of suffixes.
+# The remainders are stemmed with an explicit stack instead of recursion, so long words do not reach the recursion limit.
+# It is a pure function: all its state is local to the call, so it can run in many threads at the same time
+def stem_candidates(lexicon, word):
+    # Stems found for every remainder of the word
+    memo = {}
+    deepest = 0
+    # Remainders being stemmed, from the word to the deepest one: [remainder, converted remainder, remainders without its suffixes, next one]
+    stack = [_stem_frame(lexicon, word)]
+
+    while stack:
+        frame = stack[-1]
+        remainder, converted, shorter, index = frame
+        # Skip the shorter remainders that are already stemmed
+        while index < len(shorter) and shorter[index] in memo:
+            index += 1
+        frame[3] = index
+        # Stem the next shorter remainder before this one
+        if index < len(shorter):
+            deepest = max(deepest, len(stack))
+            stack.append(_stem_frame(lexicon, shorter[index]))
+            continue
+
+        stems = []
+        # If word is a number or already in the list, it is a stem itself
+        if converted.isnumeric() or converted in lexicon.words:
+            stems.append(converted)
+        # Stems of the remainders without every suffix, in the order of the suffixes
+        for remainder_stems in map(memo.__getitem__, shorter):
+            stems.extend(remainder_stems)
+        # Keep only the first occurrence of every stem
+        memo[remainder] = tuple(dict.fromkeys(stems))
+        stack.pop()
+
+    if depth_observer is not None:
+        depth_observer(deepest)
+    return memo[word]
+
+
+# Frame of the stem_candidates stack for the remainder of the word
+def _stem_frame(lexicon, remainder):
+    # Change the word to lowercase and convert it if the word has changed root or suffix
+    converted = Stemmer.converter(remainder.lower())
+    # For every suffix the word ends with, the remainder without the suffix
+    shorter = [converted[:position] for suffix, position in lexicon.suffix_trie.matches(converted)]
+    return [remainder, converted, shorter, 0]
+
+
+# Number of the stemmed words kept in the cache
+STEM_CACHE_SIZE = 4096
+
+
+# Returns the longest stem of the word or the word itself if it has no stem.
+# Lexicons are compared by their version, so the cached stems are never reused with another lexicon.
+# The cache is thread-safe and the cached stems are immutable strings
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def longest_stem(lexicon, word):
+    stems = stem_candidates(lexicon, word)
+    # Choose the first stem with the maximum length
+    return max(stems, key=len) if stems else word
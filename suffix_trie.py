@@ -0,0 +1,39 @@
+# Key of the trie node that stores the index of the suffix ending at this node
+_SUFFIX_INDEX = None
+
+
+# SuffixTrie class definition, trie of the reversed suffixes
+class SuffixTrie:
+    __slots__ = ("suffixes", "root")
+
+    # Constructor of the SuffixTrie class
+    def __init__(self, suffixes):
+        # Suffixes in their original order, the index of the suffix is its priority
+        self.suffixes = tuple(suffixes)
+        # Every node is a dictionary of the next characters, the suffixes are inserted from the last character to the first
+        self.root = {}
+        for index, suffix in enumerate(self.suffixes):
+            # Empty suffix would never change the word, so it is skipped
+            if not suffix:
+                continue
+            node = self.root
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            # If the same suffix is listed twice, the first one wins
+            node.setdefault(_SUFFIX_INDEX, index)
+
+    # Returns the list of (suffix, position) pairs for every suffix the word ends with, in the order of the suffixes.
+    # Position is the index where the suffix starts, so word[:position] is the word without the suffix
+    def matches(self, word):
+        found = []
+        node = self.root
+        # Walk the word from right to left, one character at a time
+        for position in range(len(word) - 1, -1, -1):
+            node = node.get(word[position])
+            if node is None:
+                break
+            if _SUFFIX_INDEX in node:
+                found.append((node[_SUFFIX_INDEX], position))
+        # Sort by the suffix index so that the result does not depend on the suffix length
+        found.sort()
+        return [(self.suffixes[index], position) for index, position in found]
@@ -0,0 +1,27 @@
+""" Results of convert_batch on the short numerical texts and the inputs accepted by the steps of the pipeline """
+import pytest
+
+from convert_extract import convert_batch, extract_entities, is_three_numerical, split_input, suffix_shorten_dict, to_convert
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2001 12', {'year': 2001, 'month': None, 'day': 12, 'iso': None, 'method': 'entities'}),
+    ('2005 15', {'year': 2005, 'month': None, 'day': 15, 'iso': None, 'method': 'entities'}),
+    ('2003 11', {'year': 2003, 'month': None, 'day': 11, 'iso': None, 'method': 'entities'}),
+    ('19920625', {'year': 1992, 'month': 6, 'day': 25, 'iso': '1992-06-25', 'method': 'numeric'}),
+    ('199206/15', {'year': 1992, 'month': 6, 'day': 15, 'iso': '1992-06-15', 'method': 'numeric'}),
+    ('iki min bir on iki', {'year': 2001, 'month': None, 'day': 12, 'iso': None, 'method': 'entities'}),
+])
+def test_numerical_dates(text, expected):
+    result = convert_batch([text])[0]
+    assert {name: result[name] for name in expected} == expected
+
+
+def test_strings_and_tokens():
+    # public steps of the pipeline accept the plain strings of split_input as well as records.Token
+    assert is_three_numerical(['1992', '17', 'alma', 'yemek']) is False
+    assert is_three_numerical(['1992', ':', '06', ':', '17']) is True
+    expected = {'year': '1995', 'day': '12', 'month': 'dekabr'}
+    assert extract_entities('1995 12 dekabr'.split(' ')) == expected
+    assert extract_entities(to_convert('1995 12 dekabr'.split(' '))) == expected
+    assert extract_entities(to_convert(split_input('min doqquz yuz doxsan besh on iki dekabr', suffix_shorten_dict))) == expected
@@ -0,0 +1,62 @@
+""" FuzzyMatcher and SuffixNormalizer give the same matches as difflib.get_close_matches on the vocabularies of the conversion,
+    their typos and random strings
+"""
+import random
+from difflib import get_close_matches
+
+import pytest
+
+import convert_extract
+from benchmark import TYPO_LETTERS, make_typo
+from fuzzy_match import FuzzyMatcher, SuffixNormalizer, month_forms, ordinal_suffix_variants
+
+INPUTS_PER_VOCABULARY = 5000
+
+
+def fuzzed_inputs(vocabulary:list, seed:int = 0) -> list:
+    """ Words of the vocabulary, their typos (up to two) and random strings of similar length """
+    rng = random.Random(seed)
+    inputs = list(vocabulary)
+    while len(inputs) < INPUTS_PER_VOCABULARY:
+        word = rng.choice(vocabulary)
+        operation = rng.randrange(3)
+        if operation == 0:
+            inputs.append(make_typo(word, rng))
+        elif operation == 1:
+            inputs.append(make_typo(make_typo(word, rng), rng))
+        else:
+            inputs.append(''.join(rng.choice(TYPO_LETTERS) for _ in range(rng.randint(1, len(word) + 2))))
+    return inputs
+
+
+def close_match(word:str, vocabulary:list, cutoff:float):
+    matches = get_close_matches(word, vocabulary, cutoff=cutoff)
+    return matches[0] if matches else None
+
+
+@pytest.mark.parametrize('vocabulary, cutoff', [
+    (list(convert_extract.numbers), 0.81),
+    (convert_extract.MONTHS, 0.85),
+    (list(convert_extract.suffix_shorten_dict), 0.7),
+])
+def test_fuzzy_matcher_parity(vocabulary, cutoff):
+    matcher = FuzzyMatcher(vocabulary, cutoff)
+    inputs = fuzzed_inputs(vocabulary)
+    if vocabulary is convert_extract.MONTHS:
+        inputs += [form for month in vocabulary for form in month_forms(month)]
+    wrong = [(word, matcher.match(word), close_match(word, vocabulary, cutoff)) for word in inputs
+             if matcher.match(word) != close_match(word, vocabulary, cutoff)]
+    assert wrong == []
+
+
+def test_suffix_normalizer_parity():
+    shorten_dict = convert_extract.suffix_shorten_dict
+    normalizer = SuffixNormalizer(shorten_dict, cutoff=0.7)
+    inputs = ordinal_suffix_variants() + fuzzed_inputs(ordinal_suffix_variants() + ['in', 'i', 'ın', 'un', 'da', 'lar'], seed=1)
+    wrong = []
+    for suffix in inputs:
+        match = close_match(suffix, list(shorten_dict), 0.7)
+        expected = shorten_dict[match] if match is not None else suffix
+        if normalizer.normalize(suffix) != expected:
+            wrong.append((suffix, normalizer.normalize(suffix), expected))
+    assert wrong == []
@@ -0,0 +1,50 @@
+""" Number words read by split_input and to_convert: every number 1..2100 written with numerals.number_to_words is converted back,
+    and the phrase table converts the runs of the number words the same way as numerals.parse_values
+"""
+import random
+
+import convert_extract
+from benchmark import make_typo
+from convert_extract import join_values, numbers, split_input, split_tokens, suffix_shorten_dict, to_convert
+from numerals import PhraseTable, date_phrases, number_to_words
+
+
+def convert(text:str) -> str:
+    return join_values(to_convert(split_input(text, suffix_shorten_dict)))
+
+
+def test_numbers_round_trip():
+    converted = {number: convert(number_to_words(number)) for number in range(1, 2101)}
+    assert {number: text for number, text in converted.items() if text != str(number)} == {}
+
+
+def test_punctuation_ends_number():
+    assert convert('iki min on') == '2010'
+    assert convert('iki min, on') == '2000 , 10'
+
+
+def test_digits_are_not_merged():
+    assert convert('iki min on 5 aprel') == '2010 5 aprel'
+
+
+def test_phrase_table_parity(monkeypatch):
+    # every run of date_phrases is converted by the phrase table to the same values and spans as by parse_values,
+    # in a seeded spelling of its number words and with a typo in one of them
+    rng = random.Random(0)
+    spellings = {}
+    for word, value in numbers.items():
+        spellings.setdefault(value, []).append(word)
+    texts = []
+    for values in dict.fromkeys(date_phrases()):
+        words = [rng.choice(spellings[value]) for value in values]
+        texts.append(' '.join(words) + ' aprel')
+        position = rng.randrange(len(words))
+        words[position] = make_typo(words[position], rng)
+        texts.append(' '.join(words) + ' aprel')
+
+    def convert_all():
+        return [to_convert(split_tokens(text, suffix_shorten_dict)) for text in texts]
+
+    with_table = convert_all()
+    monkeypatch.setattr(convert_extract, 'get_phrase_table', lambda: PhraseTable([]))
+    assert [text for text, tokens, parsed in zip(texts, with_table, convert_all()) if tokens != parsed] == []
@@ -0,0 +1,27 @@
+""" Worker processes of convert_parallel use the date fallback backend set in the parent process """
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import convert_extract
+from date_fallback import set_fallback
+from parallel import _init_worker, convert_parallel, worker_fallback
+
+# "5 5 2005 5" is parsed only by the fallback: dateparser reads it, the disabled fallback does not
+TEXTS = ['5 5 2005 5', 'min doqquz yuz on iki iyirmi besh aprel', '1992.06.25'] * 3
+
+
+@pytest.fixture
+def no_fallback():
+    set_fallback('none')
+    yield
+    set_fallback(None)
+
+
+def test_workers_use_set_fallback(no_fallback):
+    expected = convert_extract.convert_batch(TEXTS)
+    assert expected[0]['iso'] is None
+    assert list(convert_parallel(TEXTS, workers=2, chunk_size=2)) == expected
+
+    with ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(None, worker_fallback())) as pool:
+        assert pool.submit(convert_extract.lexicon_version).result() == convert_extract.lexicon_version()
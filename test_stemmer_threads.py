@@ -0,0 +1,80 @@
+""" Stress test of the stemming in many threads: shared Stemmer, new Stemmer objects and longest_stem must give
+    the single-threaded results while the caches are cleared and resized by another thread
+"""
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import convert_extract
+import stemmer
+from benchmark import generate_dates, load_verb_forms
+from stem_app import get_stemmer, to_stem
+from token_cache import TOKEN_CACHE_SIZE
+
+THREADS = 16
+TASKS = 32
+WORDS_PER_TASK = 500
+
+
+def _words() -> list:
+    words = load_verb_forms() + [word for text in generate_dates(300, 5) for word in text.split(' ')]
+    words += [word + suffix for word in words[:300] for suffix in ('larından', 'ıncı', 'da')]
+    return list(dict.fromkeys(words))
+
+
+def test_stemming_in_threads():
+    words = _words()
+    texts = generate_dates(200, 7) + list(convert_extract.test_texts)
+
+    # single-threaded reference
+    shared = get_stemmer()
+    expected_stems = {word: shared.stem_word(word) for word in words}
+    expected_to_stem = {word: to_stem(word) for word in words}
+    expected_batch = convert_extract.convert_batch(texts)
+
+    stop = threading.Event()
+
+    def churn():
+        # caches are cleared and resized while the other threads use them
+        rng = random.Random(0)
+        while not stop.is_set():
+            stemmer.longest_stem.cache_clear()
+            convert_extract.token_cache.resize(rng.choice([0, 5, 100, None]))
+            convert_extract.number_matcher.cache_clear()
+            stop.wait(0.0005)
+
+    def work(seed):
+        rng = random.Random(seed)
+        sample = rng.sample(words, min(WORDS_PER_TASK, len(words)))
+        wrong = []
+        for word in sample:
+            if shared.stem_word(word) != expected_stems[word]:
+                wrong.append(('shared', word))
+            if stemmer.Stemmer().stem_word(word) != expected_stems[word]:
+                wrong.append(('new', word))
+            if stemmer.longest_stem(shared.lexicon, word) != expected_stems[word]:
+                wrong.append(('longest_stem', word))
+            if to_stem(word) != expected_to_stem[word]:
+                wrong.append(('to_stem', word))
+        shuffled = texts[:]
+        rng.shuffle(shuffled)
+        results = {result['input']: result for result in convert_extract.convert_batch(shuffled)}
+        wrong += [('convert_batch', result['input']) for result in expected_batch if results[result['input']] != result]
+        return wrong
+
+    switch_interval = sys.getswitchinterval()
+    # switch threads as often as possible
+    sys.setswitchinterval(1e-6)
+    churner = threading.Thread(target=churn)
+    churner.start()
+    try:
+        with ThreadPoolExecutor(THREADS) as executor:
+            wrong = [item for result in executor.map(work, range(TASKS)) for item in result]
+    finally:
+        stop.set()
+        churner.join()
+        sys.setswitchinterval(switch_interval)
+        convert_extract.token_cache.resize(TOKEN_CACHE_SIZE)
+
+    assert wrong == []
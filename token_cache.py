@@ -0,0 +1,103 @@
+""" Run-scoped LRU cache of the token analyses.
+
+    Real texts repeat the same tokens ("ilin", "marti", "ikinci", "aprelin") all the time, so the analysis of every
+    distinct token is computed once and the repeated tokens cost one dictionary lookup. Tokens and the strings of
+    their analyses are interned, so the repeated tokens of the run share one string object.
+"""
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+# Number of the token analyses kept in the cache
+TOKEN_CACHE_SIZE = 65536
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _intern(value):
+    """ Interned string, or tuple of the interned strings """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, tuple):
+        return tuple(sys.intern(item) if isinstance(item, str) else item for item in value)
+    return value
+
+
+class TokenAnalysisCache:
+    """ LRU cache of token -> analysis, safe to share by several threads.
+
+        param: maxsize -> number of the tokens kept in the cache, None keeps all of them, 0 disables the cache
+
+        Example:
+            cache = TokenAnalysisCache(1000)
+            cache.get("ilin", analyze)   # calls analyze("ilin")
+            cache.get("ilin", analyze)   # returned from the cache
+    """
+
+    def __init__(self, maxsize:int = TOKEN_CACHE_SIZE):
+        self._check_size(maxsize)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _check_size(maxsize):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or >= 0: %r" % (maxsize,))
+
+    def get(self, token:str, compute):
+        """ Returns the analysis of the token, compute(token) is called only if the token is not in the cache.
+            Analysis should be immutable (string or tuple), it is shared by all callers.
+        """
+        with self._lock:
+            try:
+                analysis = self._items[token]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(token)
+                return analysis
+
+        # computed outside of the lock, two threads can compute the same token, both get the same result
+        analysis = _intern(compute(token))
+        if self.maxsize == 0:
+            return analysis
+
+        with self._lock:
+            self._items[sys.intern(token)] = analysis
+            self._items.move_to_end(token)
+            self._evict()
+        return analysis
+
+    def _evict(self):
+        if self.maxsize is not None:
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def resize(self, maxsize:int):
+        """ Changes the size of the cache, the least recently used tokens are dropped if it becomes smaller """
+        self._check_size(maxsize)
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def cache_info(self) -> CacheInfo:
+        """ Statistics of the cache, same as functools.lru_cache().cache_info() """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._items))
+
+    def cache_clear(self):
+        """ Removes all tokens and resets the statistics """
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, token) -> bool:
+        return token in self._items